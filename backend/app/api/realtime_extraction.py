@@ -4,34 +4,147 @@ Provides endpoints for extracting text from images in real-time
 """
 
 import os
+import re
 import sys
 import json
+import asyncio
 import base64
+import hashlib
 import logging
-import tempfile
-from typing import Dict, Any, Optional, List, Union
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Union
 from fastapi import APIRouter, HTTPException, Body, File, UploadFile, Form
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 import numpy as np
 import cv2
-from PIL import Image
-import io
+
+# Prefer the SIMD-accelerated base64 codec when available
+try:
+    import pybase64
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
+
+# orjson serializes responses considerably faster than the standard library
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Fast non-cryptographic hashing for the result cache
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from utils.text_extraction import extract_text_from_image, preprocess_text
-from models.ai_summarizer import (
-    summarize_with_gemini,
-    summarize_with_openai,
-    summarize_with_claude,
-    summarize_with_mistral
-)
+from utils.text_extraction import extract_text_from_image_array, preprocess_text
+from utils.image_enhancement import enhance_grayscale, limit_image_size
+from models.ai_summarizer import SUMMARIZERS, is_model_configured, summarize_with_model_async
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+if not HAS_PYBASE64:
+    logger.warning("pybase64 not installed, falling back to the standard library base64 codec. Run: pip install pybase64")
+
+def _b64decode(data: str) -> bytes:
+    """
+    Decode a base64 payload, stripping an optional data-URI prefix
+    """
+    # "data:image/png;base64,<payload>" -> "<payload>" without building a list
+    payload = data.partition(',')[2] or data
+    if HAS_PYBASE64:
+        return pybase64.b64decode(payload, validate=False)
+    return base64.b64decode(payload)
+
+def _b64encode(data: bytes) -> str:
+    """
+    Encode bytes as a base64 string
+    """
+    if HAS_PYBASE64:
+        return pybase64.b64encode(data).decode('ascii')
+    return base64.b64encode(data).decode('ascii')
+
+# Cache of extraction results keyed by image content, model and options
+RESULT_CACHE_SIZE = 512
+_result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+def _content_digest(data: bytes) -> str:
+    """
+    Hash content for use in cache keys
+    """
+    if HAS_XXHASH:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _result_cache_key(image_data: bytes, model: str, options: Dict[str, Any]) -> str:
+    """
+    Build a cache key from the decoded image bytes, model and canonical options
+    """
+    return f"{_content_digest(image_data)}:{model.lower()}:{json.dumps(options, sort_keys=True, default=str)}"
+
+def _result_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached extraction result, marking it as recently used
+    """
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is not None:
+            _result_cache.move_to_end(key)
+        return result
+
+def _result_cache_put(key: str, result: Dict[str, Any]) -> None:
+    """
+    Store an extraction result, evicting the least recently used entry when full
+    """
+    with _result_cache_lock:
+        _result_cache[key] = result
+        _result_cache.move_to_end(key)
+        if len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+# Summarizations currently running, keyed by text, model and options
+_inflight_summaries: Dict[str, "asyncio.Task"] = {}
+
+async def _summarize_coalesced(model: str, text: str, options: Dict[str, Any]) -> Any:
+    """
+    Summarize text, sharing a single LLM call between concurrent identical requests
+    
+    Args:
+        model: AI model to use (gemini, openai, claude, mistral)
+        text: Text to summarize
+        options: Summarization options
+        
+    Returns:
+        Result of the model's summarizer function
+    """
+    key = f"{_content_digest(text.encode('utf-8'))}:{model}:{json.dumps(options, sort_keys=True, default=str)}"
+    task = _inflight_summaries.get(key)
+    if task is None:
+        task = asyncio.ensure_future(summarize_with_model_async(model, text, options))
+        _inflight_summaries[key] = task
+        task.add_done_callback(lambda _: _inflight_summaries.pop(key, None))
+    else:
+        logger.info("Joining in-flight summarization for identical text")
+    
+    # Shield so a disconnecting client does not cancel the call for the others
+    return await asyncio.shield(task)
+
+# Sentence boundaries: whitespace following terminal punctuation (keeps decimals and URLs intact)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Response class used by all endpoints
+APIResponse = ORJSONResponse if HAS_ORJSON else JSONResponse
+
 # Create router
 router = APIRouter()
 
@@ -40,34 +153,64 @@ class Base64ImageRequest(BaseModel):
     model: str = "gemini"  # Default model
     options: Dict[str, Any] = {}
 
-@router.post("/extract-text-from-base64")
-async def extract_text_from_base64(request: Base64ImageRequest):
+def _decode_image(image_data: bytes) -> np.ndarray:
     """
-    Extract text from a base64-encoded image
+    Decode image bytes and downscale oversized images
+    
+    Args:
+        image_data: Encoded image bytes
+        
+    Returns:
+        Decoded BGR image
+    """
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image data")
+    return limit_image_size(image)
+
+async def _extract_and_summarize(request: Base64ImageRequest) -> Tuple[Dict[str, Any], int]:
     """
+    Extract text from a base64-encoded image and summarize it
+    
+    Args:
+        request: Base64ImageRequest containing the image, model and options
+        
+    Returns:
+        Tuple of the result payload and the HTTP status code for it
+    """
+    model = request.model.lower()
+    if model not in SUMMARIZERS:
+        # Default to Gemini
+        model = "gemini"
+    
     try:
-        # Decode base64 image
-        image_data = base64.b64decode(request.image.split(',')[1] if ',' in request.image else request.image)
+        # Decode base64 image straight into an ndarray (no temp file round-trip)
+        image_data = _b64decode(request.image)
         
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-            temp_file.write(image_data)
-            temp_file_path = temp_file.name
+        # Repeated frames (e.g. live camera polling) are served from the cache
+        # Key on the resolved model so aliases and unknown names share the default's entries
+        cache_key = _result_cache_key(image_data, model, request.options)
+        cached_result = _result_cache_get(cache_key)
+        if cached_result is not None:
+            logger.info("Returning cached extraction result")
+            return cached_result, 200
+        
+        # Blocking OpenCV/OCR/LLM work runs in the threadpool to keep the event loop free
+        image = await run_in_threadpool(_decode_image, image_data)
         
         # Extract text
         try:
-            extracted_text = extract_text_from_image(temp_file_path)
-            
-            # Clean up temporary file
-            os.unlink(temp_file_path)
+            extracted_text = await run_in_threadpool(extract_text_from_image_array, image)
             
             if not extracted_text or len(extracted_text.strip()) < 10:
-                return JSONResponse({
+                result = {
                     "status": "warning",
                     "message": "No text detected in the image",
                     "text": "",
                     "summary": ""
-                })
+                }
+                _result_cache_put(cache_key, result)
+                return result, 200
             
             # Preprocess text
             processed_text = preprocess_text(extracted_text)
@@ -75,49 +218,82 @@ async def extract_text_from_base64(request: Base64ImageRequest):
             # Generate summary if text was extracted
             summary = ""
             if processed_text and len(processed_text) > 50:
-                # Select the appropriate model
-                model = request.model.lower()
-                
-                if model == "gemini":
-                    summary = summarize_with_gemini(processed_text, request.options)
-                elif model == "openai":
-                    summary = summarize_with_openai(processed_text, request.options)
-                elif model == "claude":
-                    summary = summarize_with_claude(processed_text, request.options)
-                elif model == "mistral":
-                    summary = summarize_with_mistral(processed_text, request.options)
+                if is_model_configured(model):
+                    summary = await _summarize_coalesced(model, processed_text, request.options)
                 else:
-                    # Default to Gemini
-                    summary = summarize_with_gemini(processed_text, request.options)
+                    # Still return the extracted text when the model cannot be called
+                    summary = {
+                        "summary": f"Summarization failed: {model} model is not configured",
+                        "model": model,
+                        "processing_time": 0.0,
+                        "error": True
+                    }
             
-            return JSONResponse({
+            result = {
                 "status": "success",
                 "text": processed_text,
                 "summary": summary,
                 "word_count": len(processed_text.split())
-            })
+            }
+            
+            # Don't cache failed summaries so they are retried on the next request
+            if not (isinstance(summary, dict) and summary.get("error")):
+                _result_cache_put(cache_key, result)
+            
+            return result, 200
             
         except Exception as e:
             logger.error(f"Error extracting text: {str(e)}", exc_info=True)
-            # Clean up temporary file if it exists
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
             
-            return JSONResponse({
+            return {
                 "status": "error",
                 "message": f"Error extracting text: {str(e)}",
                 "text": "",
                 "summary": ""
-            }, status_code=500)
+            }, 500
             
     except Exception as e:
         logger.error(f"Error processing base64 image: {str(e)}", exc_info=True)
-        return JSONResponse({
+        return {
             "status": "error",
             "message": f"Error processing image: {str(e)}",
             "text": "",
             "summary": ""
-        }, status_code=400)
+        }, 400
+
+@router.post("/extract-text-from-base64")
+async def extract_text_from_base64(request: Base64ImageRequest):
+    """
+    Extract text from a base64-encoded image
+    """
+    result, status_code = await _extract_and_summarize(request)
+    return APIResponse(result, status_code=status_code)
+
+def _enhance_sync(contents: bytes) -> bytes:
+    """
+    Decode, enhance and PNG-encode an image
+    
+    Args:
+        contents: Raw bytes of the uploaded image
+        
+    Returns:
+        PNG-encoded bytes of the enhanced image
+    """
+    # Image enhancement pipeline
+    # 1. Decode straight to grayscale (np.frombuffer wraps the upload without copying)
+    gray = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError("Could not decode image data")
+    gray = limit_image_size(gray)
+    
+    # 2. Denoise and binarize for OCR
+    enhanced = enhance_grayscale(gray)
+    
+    # Encode as PNG (fast compression level)
+    ok, png = cv2.imencode('.png', enhanced, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    if not ok:
+        raise ValueError("Could not encode enhanced image")
+    return png.tobytes()
 
 @router.post("/enhance-image")
 async def enhance_image(file: UploadFile = File(...)):
@@ -125,47 +301,21 @@ async def enhance_image(file: UploadFile = File(...)):
     Enhance an image for better text extraction
     """
     try:
-        # Read image
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        # Image enhancement pipeline
-        # 1. Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # 2. Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-        
-        # 3. Noise removal
-        kernel = np.ones((1, 1), np.uint8)
-        opening = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-        
-        # 4. Edge enhancement
-        edges = cv2.Canny(opening, 50, 150)
-        
-        # 5. Combine with original
-        enhanced = cv2.bitwise_and(gray, gray, mask=edges)
-        
-        # Convert back to PIL Image
-        enhanced_img = Image.fromarray(enhanced)
-        
-        # Save to bytes
-        img_byte_arr = io.BytesIO()
-        enhanced_img.save(img_byte_arr, format='PNG')
-        img_byte_arr.seek(0)
+        # Read image and run the CPU-bound pipeline in the threadpool to keep the event loop free.
+        # The upload bytes are not kept alive here, so they can be freed once decoded.
+        png = await run_in_threadpool(_enhance_sync, await file.read())
         
         # Return base64 encoded image
-        encoded_img = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
+        encoded_img = _b64encode(png)
         
-        return JSONResponse({
+        return APIResponse({
             "status": "success",
             "enhanced_image": f"data:image/png;base64,{encoded_img}"
         })
         
     except Exception as e:
         logger.error(f"Error enhancing image: {str(e)}", exc_info=True)
-        return JSONResponse({
+        return APIResponse({
             "status": "error",
             "message": f"Error enhancing image: {str(e)}"
         }, status_code=500)
@@ -178,15 +328,14 @@ async def real_time_analysis(request: Base64ImageRequest):
     """
     try:
         # Extract text from image
-        text_response = await extract_text_from_base64(request)
-        text_data = json.loads(text_response.body)
+        text_data, status_code = await _extract_and_summarize(request)
         
         if text_data["status"] == "error":
-            return text_response
+            return APIResponse(text_data, status_code=status_code)
         
         # If no text was detected, return early
         if not text_data["text"]:
-            return JSONResponse({
+            return APIResponse({
                 "status": "warning",
                 "message": "No text detected in the image",
                 "analysis": {
@@ -211,37 +360,39 @@ async def real_time_analysis(request: Base64ImageRequest):
         }
         
         # Extract key points (simplified implementation)
-        sentences = extracted_text.split('.')
+        sentences = _SENTENCE_SPLIT_RE.split(extracted_text)
         key_points = [s.strip() for s in sentences if len(s.strip()) > 30][:5]
         analysis["key_points"] = key_points
         
         # Extract potential entities (simplified implementation)
+        # Stops as soon as 10 unique entities are found instead of collecting them all
         words = extracted_text.split()
-        potential_entities = [word for word in words if word[0].isupper() and len(word) > 3]
-        unique_entities = list(set(potential_entities))[:10]
+        seen_entities = set()
+        unique_entities = []
+        for word in words:
+            if len(word) > 3 and word[0].isupper() and word not in seen_entities:
+                seen_entities.add(word)
+                unique_entities.append(word)
+                if len(unique_entities) == 10:
+                    break
         analysis["entities"] = unique_entities
         
         # Simple topic extraction (word frequency)
-        word_freq = {}
-        for word in words:
-            if len(word) > 4:
-                word = word.lower()
-                word_freq[word] = word_freq.get(word, 0) + 1
+        word_freq = Counter(word.lower() for word in words if len(word) > 4)
         
         # Get top topics
-        topics = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
-        analysis["topics"] = [topic[0] for topic in topics]
+        analysis["topics"] = [topic for topic, _ in word_freq.most_common(5)]
         
-        return JSONResponse({
+        return APIResponse({
             "status": "success",
             "text": extracted_text,
             "analysis": analysis,
-            "word_count": len(extracted_text.split())
+            "word_count": len(words)
         })
         
     except Exception as e:
         logger.error(f"Error in real-time analysis: {str(e)}", exc_info=True)
-        return JSONResponse({
+        return APIResponse({
             "status": "error",
             "message": f"Error in real-time analysis: {str(e)}",
             "analysis": {
@@ -9,6 +9,7 @@ import json
 import time
 import logging
 import uuid
+import functools
 from typing import Dict, Any, Optional, List, Union
 from dotenv import load_dotenv
 
@@ -23,22 +24,32 @@ except ImportError:
 # Load environment variables from .env file
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
-# Initialize Supabase client
-supabase_client = None
-if HAS_SUPABASE:
+@functools.lru_cache(maxsize=1)
+def get_supabase_client():
+    """
+    Get the Supabase client, creating it on first use so processes that never store summaries skip it
+
+    Returns:
+        The Supabase client, or None if Supabase is not installed or configured
+    """
+    if not HAS_SUPABASE:
+        print("WARNING: Supabase features disabled. Install the Python client with 'pip install supabase'")
+        return None
+    
     SUPABASE_URL = os.getenv('SUPABASE_URL')
     SUPABASE_KEY = os.getenv('SUPABASE_KEY')
     
-    if SUPABASE_URL and SUPABASE_KEY:
-        try:
-            supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
-            print("Supabase client initialized successfully")
-        except Exception as e:
-            print(f"WARNING: Failed to initialize Supabase client: {str(e)}")
-    else:
+    if not (SUPABASE_URL and SUPABASE_KEY):
         print("WARNING: SUPABASE_URL or SUPABASE_KEY not set")
-else:
-    print("WARNING: Supabase features disabled. Install the Python client with 'pip install supabase'")
+        return None
+    
+    try:
+        client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        print("Supabase client initialized successfully")
+        return client
+    except Exception as e:
+        print(f"WARNING: Failed to initialize Supabase client: {str(e)}")
+        return None
 
 # Check if the API keys are loaded
 api_keys = {
@@ -59,13 +70,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.document_processor import DocumentProcessor
 from utils.text_extraction import extract_text_from_file
-from models.ai_summarizer import (
-    summarize_with_gemini,
-    summarize_with_openai,
-    summarize_with_claude,
-    summarize_with_mistral
-)
-from utils.rag_processor import RAGProcessor
+from models import ai_summarizer
 
 # Configure logging
 # Create logs directory if it doesn't exist
@@ -90,9 +95,17 @@ class SummarizerBackend:
     def __init__(self):
         """Initialize the summarizer backend"""
         self.document_processor = DocumentProcessor()
-        self.rag_processor = RAGProcessor()
         logger.info("SummarizerBackend initialized")
     
+    @functools.cached_property
+    def rag_processor(self) -> "RAGProcessor":
+        """
+        RAG processor, created on first use so document worker processes never build one
+        """
+        # Importing rag_processor probes every configured provider, which document workers do not need
+        from utils.rag_processor import RAGProcessor
+        return RAGProcessor()
+    
     def process_document(self, file_path: str, file_type: str, options: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a document and generate a summary
@@ -128,13 +141,16 @@ class SummarizerBackend:
             # Summarize text using selected AI model
             model = options.get("model", "gemini").lower()
             summary_result = self.summarize_text(extracted_text, model, options)
+            # Report the model that actually produced the summary
+            model = summary_result.get("model", model)
             
             # Calculate total processing time
             processing_time = time.time() - start_time
             
             # Store summary in Supabase if client is available and user_id is provided
             summary_id = None
-            if supabase_client and user_id:
+            supabase_client = get_supabase_client() if user_id else None
+            if supabase_client:
                 try:
                     summary_id = str(uuid.uuid4())
                     summary_data = {
@@ -164,7 +180,9 @@ class SummarizerBackend:
                 "model": model,
                 "processing_time": processing_time,
                 "word_count": word_count,
-                "summary_id": summary_id
+                "summary_id": summary_id,
+                # Claude and Mistral report API failures as a summary flagged with "error"
+                "summary_error": bool(summary_result.get("error"))
             }
             
         except Exception as e:
@@ -200,16 +218,8 @@ class SummarizerBackend:
         logger.info(f"Using summarization options: {summarization_options}")
         
         try:
-            if model == "gemini":
-                return summarize_with_gemini(text, summarization_options)
-            elif model == "openai":
-                return summarize_with_openai(text, summarization_options)
-            elif model == "claude":
-                return summarize_with_claude(text, summarization_options)
-            elif model == "mistral":
-                return summarize_with_mistral(text, summarization_options)
-            else:
-                raise ValueError(f"Unsupported AI model: {model}")
+            # Uploads carry no subscription tier, so use the requested model with truncation and caching only
+            return ai_summarizer.summarize_with_cache(text, model, summarization_options)
         except Exception as e:
             logger.error(f"Error summarizing with {model}: {str(e)}", exc_info=True)
             raise
@@ -274,6 +284,45 @@ class SummarizerBackend:
                 "error": str(e)
             }
 
+@functools.lru_cache(maxsize=1)
+def get_backend() -> SummarizerBackend:
+    """
+    Get the shared SummarizerBackend instance, creating it on first use
+
+    Returns:
+        The process-wide SummarizerBackend
+    """
+    return SummarizerBackend()
+
+def init_document_worker() -> None:
+    """
+    Set up a document worker process: log straight to stderr and build the backend up front
+    The server's log queue has no listener in worker processes, so its handlers are replaced
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()],
+        force=True
+    )
+    get_backend()
+
+def process_document_in_worker(file_path: str, file_type: str, options: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Process a document with this process's shared backend
+    Entry point for worker processes, which cannot receive the backend instance itself
+
+    Args:
+        file_path: Path to the document (local path or URL)
+        file_type: Type of document (pdf, image, etc.)
+        options: Summarization options including model, length, style, focus, language
+        user_id: Optional user ID for storing in Supabase
+
+    Returns:
+        Dict containing summary, extracted text, processing time, and word count
+    """
+    return get_backend().process_document(file_path, file_type, options, user_id)
+
 # Command-line interface for testing
 if __name__ == "__main__":
     import argparse
@@ -291,7 +340,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     # Initialize backend
-    backend = SummarizerBackend()
+    backend = get_backend()
     
     # Process document
     result = backend.process_document(
@@ -312,19 +361,3 @@ if __name__ == "__main__":
             json.dump(result, f, indent=2)
     else:
         print(json.dumps(result, indent=2))
-
-    # Example usage
-    result = backend.process_document(
-        "https://example.com/sample.pdf",
-        "pdf",
-        {
-            "model": "gemini",
-            "length": "medium",
-            "style": "paragraph",  # Updated to match frontend options
-            "focus": "comprehensive",
-            "language": "en"
-        },
-        "test-user-id"
-    )
-    
-    print(json.dumps(result, indent=2))
@@ -10,9 +10,18 @@ import time
 import logging
 from typing import Dict, Any, Optional, List, Union
 from fastapi import FastAPI, HTTPException, Body, File, UploadFile, Form, Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 
+# orjson serializes responses considerably faster than the standard library
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -26,7 +35,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI Scientific Research Summarizer RAG API",
     description="API for context-aware question answering using RAG",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse
 )
 
 # Add CORS middleware
@@ -41,6 +51,13 @@ app.add_middleware(
 # Initialize RAG processor
 rag_processor = RAGProcessor()
 
+@app.on_event("startup")
+async def warm_up():
+    """
+    Warm up the embedding client so the first request doesn't pay the setup cost
+    """
+    await run_in_threadpool(rag_processor.warm_up)
+
 # Define request/response models
 class DocumentProcessRequest(BaseModel):
     document_id: str
@@ -147,4 +164,5 @@ async def read_root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # "auto" picks uvloop and httptools when installed, falling back to asyncio and h11
+    uvicorn.run(app, host="0.0.0.0", port=8001, loop="auto", http="auto")
@@ -7,21 +7,52 @@ import os
 import sys
 import json
 import time
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List, Union
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Query, Body
+import logging.handlers
+import queue
+import multiprocessing
+import tempfile
+import pathlib
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Annotated, Dict, Any, AsyncIterator, Optional, List, Tuple, Union
+from urllib.parse import urlparse
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException, BackgroundTasks, Query, Body, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.background import BackgroundTask
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from typing import Dict, Any, List, Optional, Union
 import uvicorn
 import importlib
+import aiofiles
+
+# orjson serializes responses considerably faster than the standard library
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Async HTTP client for downloading fileUrl documents without tying up a worker thread
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.main import SummarizerBackend
-from utils.document_processor import DocumentProcessor
+from app.main import SummarizerBackend, get_backend, init_document_worker, process_document_in_worker
+from models.ai_summarizer import close_async_http_client, close_http_client
+from utils.text_extraction import warm_up_ocr
 
 # Configure logging
 # Create logs directory if it doesn't exist
@@ -30,39 +61,391 @@ os.makedirs(log_dir, exist_ok=True)
 
 log_file = os.path.join(log_dir, "api.log")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+# Uploaded files are staged here while they are processed; resolved once, independent of the working directory
+TEMP_DIR = pathlib.Path(__file__).resolve().parent.parent / "temp"
+os.makedirs(TEMP_DIR, exist_ok=True)
+
+log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+log_listener: Optional[logging.handlers.QueueListener] = None
+
+if __name__ == "__mp_main__":
+    # The forkserver (or a spawned worker) re-imports this file when it is run as a script; a queue
+    # started here would have no listener thread in the forked workers, so log straight to stderr
+    logging.basicConfig(level=logging.INFO, format=log_format, force=True)
+else:
+    # Request handlers only enqueue log records; a background thread writes them to the file and console
+    log_formatter = logging.Formatter(log_format)
+    log_output_handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+    for handler in log_output_handlers:
+        handler.setFormatter(log_formatter)
+    
+    log_queue = queue.Queue(-1)
+    log_listener = logging.handlers.QueueListener(log_queue, *log_output_handlers, respect_handler_level=True)
+    log_listener.start()
+    
+    # The queue carries the bare message; the listener's handlers apply the full format once
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    # force=True replaces the handlers app.main installed when it was imported above
+    logging.basicConfig(
+        level=logging.INFO,
+        handlers=[queue_handler],
+        force=True
+    )
 
 logger = logging.getLogger(__name__)
 
+# Uploads are copied to disk in chunks of this size instead of being read into memory at once
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Limit the number of uploads being written and summarized at the same time
+UPLOAD_SEM = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENT_UPLOADS", "4")))
+
+# Document extraction and summarization run in worker processes so parsing and OCR are not serialized by the GIL
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", os.cpu_count() or 1))
+document_executor: Optional[ProcessPoolExecutor] = None
+
+async def _process_document(file_path: str, file_type: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run SummarizerBackend.process_document in the worker process pool
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(document_executor, process_document_in_worker, file_path, file_type, options)
+
+# Cache of successful summaries keyed by file content, model and options
+SUMMARY_CACHE_SIZE = 256
+_summary_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+def _summary_cache_key(file_digest: str, options: Dict[str, Any]) -> str:
+    """
+    Build a cache key from the file's SHA-256 digest and canonical options (model included)
+    """
+    return f"{file_digest}:{json.dumps(options, sort_keys=True, default=str)}"
+
+def _summary_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached summary, marking it as recently used
+    """
+    result = _summary_cache.get(key)
+    if result is not None:
+        _summary_cache.move_to_end(key)
+    return result
+
+def _is_cacheable_summary(result: Dict[str, Any]) -> bool:
+    """
+    Whether a process_document result may be cached; failed summaries are retried on the next request
+    """
+    return result.get("status") != "error" and not result.get("summary_error")
+
+def _summary_cache_put(key: str, result: Dict[str, Any]) -> None:
+    """
+    Store a summary, evicting the least recently used entry when full
+    """
+    _summary_cache[key] = result
+    _summary_cache.move_to_end(key)
+    if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+
+# Cache of RAG answers keyed by document version, question, model and conversation history
+RAG_ANSWER_CACHE_SIZE = 512
+_rag_answer_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+# Bumped whenever a document is (re)indexed so answers from the old index are never served
+_rag_document_versions: Dict[str, int] = {}
+
+def _rag_answer_cache_key(document_id: str, question: str, model: str, conversation_history: Optional[List[Dict[str, str]]]) -> str:
+    """
+    Build a cache key from the document's current index version, normalized question, model and history
+    """
+    question_digest = hashlib.sha256(question.strip().lower().encode("utf-8")).hexdigest()
+    history_digest = hashlib.sha256(json.dumps(conversation_history or [], sort_keys=True).encode("utf-8")).hexdigest()
+    version = _rag_document_versions.get(document_id, 0)
+    return f"{document_id}:{version}:{question_digest}:{model.lower()}:{history_digest}"
+
+def _rag_answer_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached RAG answer, marking it as recently used
+    """
+    result = _rag_answer_cache.get(key)
+    if result is not None:
+        _rag_answer_cache.move_to_end(key)
+    return result
+
+def _rag_answer_cache_put(key: str, result: Dict[str, Any]) -> None:
+    """
+    Store a RAG answer, evicting the least recently used entry when full
+    """
+    _rag_answer_cache[key] = result
+    _rag_answer_cache.move_to_end(key)
+    if len(_rag_answer_cache) > RAG_ANSWER_CACHE_SIZE:
+        _rag_answer_cache.popitem(last=False)
+
+def _invalidate_rag_answers(document_id: str) -> None:
+    """
+    Make cached answers for a document unreachable after it is reindexed
+    """
+    _rag_document_versions[document_id] = _rag_document_versions.get(document_id, 0) + 1
+
+def _save_upload(source, suffix: str) -> Tuple[str, str]:
+    """
+    Copy an uploaded file object to a uniquely named temp file in chunks, hashing it on the way
+    
+    Args:
+        source: Binary file object of the upload (UploadFile.file)
+        suffix: File name suffix for the temp file, including the dot
+        
+    Returns:
+        Tuple of the temp file path and the SHA-256 hex digest of its contents
+    """
+    file_hash = hashlib.sha256()
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=TEMP_DIR, suffix=suffix) as dest:
+        try:
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                file_hash.update(chunk)
+                dest.write(chunk)
+        except BaseException:
+            dest.close()
+            os.unlink(dest.name)
+            raise
+    return dest.name, file_hash.hexdigest()
+
+# Map file extension to file type for uploads
+EXTENSION_FILE_TYPES = {
+    'pdf': 'pdf',
+    **dict.fromkeys(['jpg', 'jpeg', 'png', 'webp', 'gif', 'bmp'], 'image'),
+    **dict.fromkeys(['docx', 'doc', 'txt', 'rtf', 'odt'], 'document'),
+    **dict.fromkeys(['csv', 'xls', 'xlsx'], 'spreadsheet')
+}
+
+def _sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """
+    Format a server-sent event frame with a JSON payload
+    """
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + _json_bytes(data) + b"\n\n"
+
+def _upload_file_type(filename: str) -> Tuple[str, str]:
+    """
+    Determine the extension and document type of an uploaded file
+    
+    Args:
+        filename: Name of the uploaded file
+        
+    Returns:
+        Tuple of the lowercase extension (without the dot) and the file type
+    """
+    file_extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    
+    file_type = EXTENSION_FILE_TYPES.get(file_extension)
+    if file_type is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type: {file_extension}")
+    
+    return file_extension, file_type
+
+def _json_bytes(content: Any) -> bytes:
+    """
+    Serialize a constant payload once so static endpoints can return it as-is
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+ROOT_BYTES = _json_bytes({"status": "API is running", "version": "1.0.0"})
+HEALTH_BYTES = _json_bytes({"status": "healthy"})
+MODELS_BYTES = _json_bytes({
+    "models": [
+        {"id": "gemini", "name": "Google Gemini", "tier": "basic"},
+        {"id": "openai", "name": "OpenAI GPT", "tier": "silver"},
+        {"id": "claude", "name": "Anthropic Claude", "tier": "premium"},
+        {"id": "mistral", "name": "Mistral AI", "tier": "premium"}
+    ]
+})
+
+# Shared connection pool for fileUrl downloads, opened on startup
+download_client: Optional["httpx.AsyncClient"] = None
+
+async def _download_to_temp(url: str) -> Tuple[str, str]:
+    """
+    Stream a remote document to a temporary file, hashing it on the way
+    
+    Args:
+        url: URL of the document
+        
+    Returns:
+        Tuple of the local file path and the SHA-256 hex digest of its contents
+    """
+    # Keep the URL's extension so type detection by extension still works
+    suffix = os.path.splitext(urlparse(url).path)[1]
+    fd, local_path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    
+    file_hash = hashlib.sha256()
+    try:
+        async with download_client.stream("GET", url) as response:
+            response.raise_for_status()
+            async with aiofiles.open(local_path, "wb") as f:
+                async for chunk in response.aiter_bytes(UPLOAD_CHUNK_SIZE):
+                    file_hash.update(chunk)
+                    await f.write(chunk)
+    except BaseException:
+        os.remove(local_path)
+        raise
+    
+    return local_path, file_hash.hexdigest()
+
+APIResponse = ORJSONResponse if HAS_ORJSON else JSONResponse
+
+# Largest upload body accepted; bigger requests are rejected from their Content-Length header alone
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_PATHS = ("/api/upload-and-summarize", "/api/upload-and-summarize/stream")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Scientific Research Summarizer API",
     description="API for processing and summarizing scientific research documents",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=APIResponse
 )
 
-# Add CORS middleware
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Reject oversized uploads before their body is read
+    Registered before CORS so the rejection still carries CORS headers
+    """
+    if request.method == "POST" and request.url.path in UPLOAD_PATHS:
+        content_length = request.headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+            logger.warning(f"Rejected {content_length}-byte upload to {request.url.path}")
+            return APIResponse(
+                {"error": f"File too large: uploads are limited to {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"},
+                status_code=413
+            )
+    return await call_next(request)
+
+# Origins allowed to call the API from a browser, comma-separated (defaults to the local Next.js frontend)
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
+    if origin.strip()
+]
+
+# Add CORS middleware; max_age lets browsers cache preflight responses for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
-# Initialize backend
-summarizer_backend = SummarizerBackend()
-document_processor = DocumentProcessor()
+# Server-sent event endpoints; gzip would buffer their events instead of flushing each one
+EVENT_STREAM_PATHS = ("/api/upload-and-summarize/stream",)
+
+class EventStreamAwareGZipMiddleware:
+    """GZipMiddleware that passes event-stream endpoints through uncompressed"""
+    
+    def __init__(self, app, exclude_paths: Tuple[str, ...], **gzip_options: Any):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, **gzip_options)
+        self.exclude_paths = exclude_paths
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip_app(scope, receive, send)
+
+# Compress large responses such as extractedText; small payloads and event streams are sent as-is
+app.add_middleware(EventStreamAwareGZipMiddleware, exclude_paths=EVENT_STREAM_PATHS, minimum_size=1024, compresslevel=5)
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """
+    Return HTTP errors in the {"error": ...} shape the frontend reads
+    """
+    logger.error(f"HTTP {exc.status_code} on {request.url.path}: {exc.detail}")
+    return APIResponse({"error": str(exc.detail)}, status_code=exc.status_code, headers=getattr(exc, "headers", None))
+
+def _cors_error_headers(request: Request) -> Dict[str, str]:
+    """
+    CORS headers for a response built outside CORSMiddleware, so the browser can still read it
+    """
+    origin = request.headers.get("origin")
+    if origin is None or (origin not in ALLOWED_ORIGINS and "*" not in ALLOWED_ORIGINS):
+        return {}
+    return {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Vary": "Origin"
+    }
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """
+    Log unexpected errors once, centrally, and return them as a 500
+    Starlette runs this handler outside CORSMiddleware, so the CORS headers are added here
+    """
+    logger.error(f"Unhandled error on {request.url.path}: {str(exc)}", exc_info=exc)
+    return APIResponse({"error": str(exc)}, status_code=500, headers=_cors_error_headers(request))
+
+@app.on_event("startup")
+async def warm_up():
+    """
+    Build the shared backend and warm up OCR and the embedding client so the first request doesn't pay the setup cost
+    """
+    backend = await run_in_threadpool(get_backend)
+    await run_in_threadpool(warm_up_ocr)
+    await run_in_threadpool(backend.rag_processor.warm_up)
+
+@app.on_event("startup")
+async def start_document_workers():
+    """
+    Start the document worker processes, each logging to stderr and building its own backend up front
+    """
+    global document_executor
+    # forkserver avoids forking a process that already runs threads; Windows only supports spawn
+    context = multiprocessing.get_context("spawn" if sys.platform == "win32" else "forkserver")
+    document_executor = ProcessPoolExecutor(
+        max_workers=DOCUMENT_WORKERS,
+        mp_context=context,
+        initializer=init_document_worker
+    )
+
+@app.on_event("startup")
+async def open_download_client():
+    """
+    Open the pooled async client used for fileUrl downloads
+    """
+    global download_client
+    if HAS_HTTPX:
+        download_client = httpx.AsyncClient(
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+
+@app.on_event("shutdown")
+async def close_clients():
+    """
+    Stop the document workers, close the shared HTTP clients and flush queued log records
+    """
+    if document_executor is not None:
+        document_executor.shutdown(wait=True, cancel_futures=True)
+    if download_client is not None:
+        await download_client.aclose()
+    await close_async_http_client()
+    close_http_client()
+    if log_listener is not None:
+        log_listener.stop()
+
+# Request models are immutable and drop unknown fields instead of storing them
+REQUEST_MODEL_CONFIG = ConfigDict(extra='ignore', frozen=True)
 
 # Define request and response models
 class SummarizeRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+    
     fileUrl: str
     fileType: str
     model: str
@@ -81,12 +464,16 @@ class ErrorResponse(BaseModel):
 
 # RAG API models
 class ProcessDocumentRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+    
     document_id: str
     document_text: str
-    chunk_size: int = 500
-    chunk_overlap: int = 100
+    chunk_size: Annotated[int, Field(gt=0)] = 500
+    chunk_overlap: Annotated[int, Field(ge=0)] = 100
 
 class QuestionRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+    
     question: str
     document_id: str
     model: str = "gemini"
@@ -95,7 +482,7 @@ class QuestionRequest(BaseModel):
 @app.get("/")
 async def root():
     """Root endpoint to check if the API is running"""
-    return {"status": "API is running", "version": "1.0.0"}
+    return Response(content=ROOT_BYTES, media_type="application/json")
 
 @app.post("/api/summarize", response_model=Union[SummarizeResponse, ErrorResponse])
 async def summarize(request: SummarizeRequest):
@@ -108,36 +495,55 @@ async def summarize(request: SummarizeRequest):
     Returns:
         SummarizeResponse containing summary, extractedText, model, processingTime, and wordCount
     """
-    try:
-        logger.info(f"Summarize request received for {request.fileUrl}")
-        
-        # Process document
-        result = summarizer_backend.process_document(
+    logger.info(f"Summarize request received for {request.fileUrl}")
+    
+    options = {
+        "model": request.model,
+        **request.options
+    }
+    
+    if download_client is None or not request.fileUrl.startswith('http'):
+        # Let the backend fetch or open the file itself
+        result = await _process_document(
             request.fileUrl,
             request.fileType,
-            {
-                "model": request.model,
-                **request.options
-            }
+            options
         )
-        
-        # Check for errors
-        if result.get("status") == "error":
-            logger.error(f"Error processing document: {result.get('error')}")
-            return {"error": result.get("error", "Unknown error")}
-        
-        # Return response
-        return {
-            "summary": result["summary"],
-            "extractedText": result["extracted_text"],
-            "model": result["model"],
-            "processingTime": result["processing_time"],
-            "wordCount": result["word_count"]
-        }
-    
-    except Exception as e:
-        logger.error(f"Error in summarize endpoint: {str(e)}", exc_info=True)
-        return {"error": str(e)}
+    else:
+        # Download on the event loop, then process the local copy off it
+        local_path, file_digest = await _download_to_temp(request.fileUrl)
+        try:
+            cache_key = _summary_cache_key(file_digest, options)
+            result = _summary_cache_get(cache_key)
+            if result is not None:
+                logger.info(f"Returning cached summary for {request.fileUrl}")
+            else:
+                result = await _process_document(
+                    local_path,
+                    request.fileType,
+                    options
+                )
+                if _is_cacheable_summary(result):
+                    _summary_cache_put(cache_key, result)
+        finally:
+            try:
+                os.remove(local_path)
+            except FileNotFoundError:
+                pass
+    
+    # Check for errors
+    if result.get("status") == "error":
+        logger.error(f"Error processing document: {result.get('error')}")
+        return {"error": result.get("error", "Unknown error")}
+    
+    # Return response
+    return {
+        "summary": result["summary"],
+        "extractedText": result["extracted_text"],
+        "model": result["model"],
+        "processingTime": result["processing_time"],
+        "wordCount": result["word_count"]
+    }
 
 @app.post("/api/upload-and-summarize", response_model=Union[SummarizeResponse, ErrorResponse])
 async def upload_and_summarize(
@@ -164,121 +570,239 @@ async def upload_and_summarize(
     Returns:
         SummarizeResponse containing summary, extractedText, model, processingTime, and wordCount
     """
-    try:
-        logger.info(f"Upload and summarize request received for {file.filename}")
-        
-        # Determine file type
-        file_extension = os.path.splitext(file.filename)[1].lower().lstrip('.')
-        
-        # Map file extension to file type
-        if file_extension == 'pdf':
-            file_type = 'pdf'
-        elif file_extension in ['jpg', 'jpeg', 'png', 'webp', 'gif', 'bmp']:
-            file_type = 'image'
-        elif file_extension in ['docx', 'doc', 'txt', 'rtf', 'odt']:
-            file_type = 'document'
-        elif file_extension in ['csv', 'xls', 'xlsx']:
-            file_type = 'spreadsheet'
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_extension}")
-        
-        # Create temp directory if it doesn't exist
-        os.makedirs("backend/temp", exist_ok=True)
-        
-        # Save file to temp directory
-        temp_file_path = f"backend/temp/{file.filename}"
-        with open(temp_file_path, "wb") as f:
-            f.write(await file.read())
-        
-        # Process document
-        result = summarizer_backend.process_document(
-            temp_file_path,
-            file_type,
-            {
-                "model": model,
-                "length": length,
-                "style": style,
-                "focus": focus,
-                "language": language
-            }
-        )
-        
-        # Remove temp file
-        os.remove(temp_file_path)
-        
-        # Check for errors
-        if result.get("status") == "error":
-            logger.error(f"Error processing document: {result.get('error')}")
-            return {"error": result.get("error", "Unknown error")}
+    logger.info(f"Upload and summarize request received for {file.filename}")
+    
+    # Determine file type
+    file_extension, file_type = _upload_file_type(file.filename)
+    
+    options = {
+        "model": model,
+        "length": length,
+        "style": style,
+        "focus": focus,
+        "language": language
+    }
+    
+    async with UPLOAD_SEM:
+        # Save file to a uniquely named temp file straight from the spooled upload, off the event loop
+        temp_file_path, file_digest = await run_in_threadpool(_save_upload, file.file, f".{file_extension}")
+        try:
+            cache_key = _summary_cache_key(file_digest, options)
+            result = _summary_cache_get(cache_key)
+            if result is not None:
+                logger.info(f"Returning cached summary for {file.filename}")
+            else:
+                # Process document in a worker process
+                result = await _process_document(
+                    temp_file_path,
+                    file_type,
+                    options
+                )
+                if _is_cacheable_summary(result):
+                    _summary_cache_put(cache_key, result)
+        finally:
+            # Remove temp file on both the success and error paths
+            os.unlink(temp_file_path)
+    
+    # Check for errors
+    if result.get("status") == "error":
+        logger.error(f"Error processing document: {result.get('error')}")
+        return {"error": result.get("error", "Unknown error")}
+    
+    # Return response
+    return {
+        "summary": result["summary"],
+        "extractedText": result["extracted_text"],
+        "model": result["model"],
+        "processingTime": result["processing_time"],
+        "wordCount": result["word_count"]
+    }
+
+@app.post("/api/upload-and-summarize/stream")
+async def upload_and_summarize_stream(
+    file: UploadFile = File(...),
+    model: str = Form(...),
+    length: str = Form("medium"),
+    style: str = Form("academic"),
+    focus: str = Form("comprehensive"),
+    language: str = Form("en"),
+    userId: Optional[str] = Form(None)
+):
+    """
+    Upload a file and summarize it, streaming progress as server-sent events
+    
+    Uses the same document worker pool and summary cache as /api/upload-and-summarize.
+    Emits a "processing" event as soon as work starts (skipped on a cache hit), then an
+    "extracted" event with extractedText and wordCount and a "summary" event with summary,
+    model and processingTime, or an "error" event if extraction or summarization fails.
+    
+    Args:
+        file: File to upload
+        model: AI model to use
+        length: Summary length
+        style: Summary style
+        focus: Summary focus
+        language: Summary language
+        userId: User ID
         
-        # Return response
-        return {
-            "summary": result["summary"],
-            "extractedText": result["extracted_text"],
-            "model": result["model"],
-            "processingTime": result["processing_time"],
-            "wordCount": result["word_count"]
-        }
-    
-    except HTTPException as e:
-        logger.error(f"HTTP error in upload_and_summarize: {str(e)}")
-        return {"error": str(e.detail)}
-    except Exception as e:
-        logger.error(f"Error in upload_and_summarize: {str(e)}", exc_info=True)
-        return {"error": str(e)}
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    logger.info(f"Streaming upload and summarize request received for {file.filename}")
+    
+    file_extension, file_type = _upload_file_type(file.filename)
+    
+    options = {
+        "model": model,
+        "length": length,
+        "style": style,
+        "focus": focus,
+        "language": language
+    }
+    
+    # Save before returning so the upload is read while the request is still open
+    async with UPLOAD_SEM:
+        temp_file_path, file_digest = await run_in_threadpool(_save_upload, file.file, f".{file_extension}")
+    
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            cache_key = _summary_cache_key(file_digest, options)
+            result = _summary_cache_get(cache_key)
+            if result is not None:
+                logger.info(f"Returning cached summary for {file.filename}")
+            else:
+                # Sent before the worker starts so the client sees progress right away
+                yield _sse_event("processing", {"stage": "extracting"})
+                async with UPLOAD_SEM:
+                    result = await _process_document(temp_file_path, file_type, options)
+                if _is_cacheable_summary(result):
+                    _summary_cache_put(cache_key, result)
+            
+            if result.get("status") == "error":
+                yield _sse_event("error", {"error": result.get("error", "Unknown error")})
+                return
+            
+            yield _sse_event("extracted", {
+                "extractedText": result["extracted_text"],
+                "wordCount": result["word_count"]
+            })
+            
+            # Claude and Mistral report API failures as a summary flagged with "error"
+            if result.get("summary_error"):
+                yield _sse_event("error", {"error": result["summary"]})
+                return
+            
+            yield _sse_event("summary", {
+                "summary": result["summary"],
+                "model": result["model"],
+                "processingTime": result["processing_time"]
+            })
+        except Exception as e:
+            logger.error(f"Error in upload_and_summarize_stream: {str(e)}", exc_info=True)
+            yield _sse_event("error", {"error": str(e)})
+    
+    # Runs after the response even if the client disconnects before the stream starts
+    cleanup = BackgroundTask(pathlib.Path(temp_file_path).unlink, missing_ok=True)
+    return StreamingResponse(events(), media_type="text/event-stream", background=cleanup)
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return Response(content=HEALTH_BYTES, media_type="application/json")
 
 @app.get("/api/models")
 async def get_models():
     """Get available AI models"""
-    return {
-        "models": [
-            {"id": "gemini", "name": "Google Gemini", "tier": "basic"},
-            {"id": "openai", "name": "OpenAI GPT", "tier": "silver"},
-            {"id": "claude", "name": "Anthropic Claude", "tier": "premium"},
-            {"id": "mistral", "name": "Mistral AI", "tier": "premium"}
-        ]
-    }
+    return Response(content=MODELS_BYTES, media_type="application/json")
 
 @app.post("/api/rag/process-document")
-async def process_document_for_rag(request: ProcessDocumentRequest):
+async def process_document_for_rag(request: ProcessDocumentRequest, backend: SummarizerBackend = Depends(get_backend)):
     """Process a document for RAG"""
-    try:
-        logger.info(f"Processing document {request.document_id} for RAG")
-        
-        result = summarizer_backend.process_document_for_rag(
-            document_id=request.document_id,
-            document_text=request.document_text,
-            chunk_size=request.chunk_size,
-            chunk_overlap=request.chunk_overlap
-        )
-        
-        return result
-    except Exception as e:
-        logger.error(f"Error processing document for RAG: {str(e)}", exc_info=True)
-        return {"error": str(e)}
+    logger.info(f"Processing document {request.document_id} for RAG")
+    
+    result = await run_in_threadpool(
+        backend.process_document_for_rag,
+        document_id=request.document_id,
+        document_text=request.document_text,
+        chunk_size=request.chunk_size,
+        chunk_overlap=request.chunk_overlap
+    )
+    _invalidate_rag_answers(request.document_id)
+    
+    return result
+
+# Status of background RAG indexing jobs, oldest first; finished jobs are evicted beyond RAG_JOB_HISTORY
+RAG_JOB_HISTORY = 1024
+rag_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+def _run_rag_job(job_id: str, backend: SummarizerBackend, request: ProcessDocumentRequest) -> None:
+    """
+    Index a document for RAG and record the outcome under its job ID
+    """
+    rag_jobs[job_id] = {"status": "running", "document_id": request.document_id}
+    result = backend.process_document_for_rag(
+        document_id=request.document_id,
+        document_text=request.document_text,
+        chunk_size=request.chunk_size,
+        chunk_overlap=request.chunk_overlap
+    )
+    _invalidate_rag_answers(request.document_id)
+    rag_jobs[job_id] = {
+        "status": "failed" if result.get("status") == "error" else "completed",
+        "document_id": request.document_id,
+        "result": result
+    }
+    
+    # Forget the oldest finished jobs once the history is full
+    while len(rag_jobs) > RAG_JOB_HISTORY:
+        oldest_id = next(iter(rag_jobs))
+        if rag_jobs[oldest_id]["status"] in ("pending", "running"):
+            break
+        rag_jobs.pop(oldest_id)
+
+@app.post("/api/rag/process-document/async", status_code=202)
+async def process_document_for_rag_async(
+    request: ProcessDocumentRequest,
+    background_tasks: BackgroundTasks,
+    backend: SummarizerBackend = Depends(get_backend)
+):
+    """Start processing a document for RAG in the background and return a job ID to poll"""
+    job_id = str(uuid.uuid4())
+    rag_jobs[job_id] = {"status": "pending", "document_id": request.document_id}
+    background_tasks.add_task(_run_rag_job, job_id, backend, request)
+    logger.info(f"Queued RAG processing job {job_id} for document {request.document_id}")
+    return {"job_id": job_id, "status": "pending"}
+
+@app.get("/api/rag/jobs/{job_id}")
+async def get_rag_job(job_id: str):
+    """Get the status, and once finished the result, of a background RAG processing job"""
+    job = rag_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"job_id": job_id, **job}
 
 @app.post("/api/rag/answer-question")
-async def answer_question_with_rag(request: QuestionRequest):
+async def answer_question_with_rag(request: QuestionRequest, backend: SummarizerBackend = Depends(get_backend)):
     """Answer a question using RAG"""
-    try:
-        logger.info(f"Answering question with RAG: '{request.question}' for document {request.document_id}")
-        
-        result = summarizer_backend.answer_question_with_rag(
-            question=request.question,
-            document_id=request.document_id,
-            model=request.model,
-            conversation_history=request.conversation_history
-        )
-        
+    logger.info(f"Answering question with RAG: '{request.question}' for document {request.document_id}")
+    
+    cache_key = _rag_answer_cache_key(request.document_id, request.question, request.model, request.conversation_history)
+    result = _rag_answer_cache_get(cache_key)
+    if result is not None:
+        logger.info(f"Returning cached RAG answer for document {request.document_id}")
         return result
-    except Exception as e:
-        logger.error(f"Error answering question with RAG: {str(e)}", exc_info=True)
-        return {"error": str(e)}
+    
+    result = await run_in_threadpool(
+        backend.answer_question_with_rag,
+        question=request.question,
+        document_id=request.document_id,
+        model=request.model,
+        conversation_history=request.conversation_history
+    )
+    if result.get("status") != "error":
+        _rag_answer_cache_put(cache_key, result)
+    
+    return result
 
 # Import and include the real-time extraction API router
 try:
@@ -289,5 +813,20 @@ except ImportError as e:
     logger.error(f"Failed to import real-time extraction API: {str(e)}")
 
 if __name__ == "__main__":
-    # Run the FastAPI server
-    uvicorn.run("app.server:app", host="0.0.0.0", port=8000, reload=True)
+    # Run the FastAPI server; set UVICORN_RELOAD=true for auto-reload during development
+    reload = os.getenv("UVICORN_RELOAD", "false").lower() == "true"
+    # One server process by default: CPU-bound work already fans out to DOCUMENT_WORKERS processes,
+    # and the in-memory RAG index, caches and job table are per process
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", "1"))
+    # "auto" picks uvloop and httptools when installed, falling back to asyncio and h11
+    uvicorn.run(
+        "app.server:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=reload,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        limit_concurrency=1000,
+        timeout_keep_alive=30
+    )
@@ -9,11 +9,18 @@ import time
 import logging
 import json
 import re
+import gzip
+import hashlib
+import asyncio
+import functools
+import contextlib
+import threading
 import requests
-from typing import Dict, Any, Optional, List, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterable, Iterator, Callable
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import AI model libraries if available
@@ -46,10 +53,481 @@ except ImportError:
     logger.warning("Mistral AI library not installed. Run: pip install mistralai")
     HAS_MISTRAL = False
 
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    logger.warning("httpx not installed, provider API calls will not reuse connections. Run: pip install httpx")
+    HAS_HTTPX = False
+
+# orjson encodes and decodes provider payloads considerably faster than the standard library
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# tiktoken lets long documents be truncated to a real token budget instead of a character estimate
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    HAS_SENTENCE_TRANSFORMERS = True
+except ImportError:
+    HAS_SENTENCE_TRANSFORMERS = False
+
+# Shared HTTP client for direct provider API calls (keeps TLS connections alive between requests)
+_http_client = None
+_http_client_lock = threading.Lock()
+
+# Async counterpart used when summarizing from the event loop
+_async_http_client = None
+
+# Rate-limit and transient server errors are retried with exponential backoff, honouring Retry-After
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+# Opt-in gzip compression of large provider request bodies; an endpoint answering 415 is sent plain from then on
+REQUEST_COMPRESSION = os.environ.get("PROVIDER_REQUEST_COMPRESSION", "").lower() in ("1", "true", "yes")
+REQUEST_COMPRESSION_MIN_BYTES = 4096
+_uncompressed_urls = set()
+
+# Pooled session used for provider calls when httpx is not installed
+_requests_session = requests.Session()
+_requests_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+))
+
 # Type definitions
 SummarizationOptions = Dict[str, Any]
 SummarizationResult = Dict[str, Any]
 
+# Environment variables that can hold the API key for each model
+MODEL_API_KEY_VARS = {
+    "gemini": ("GEMINI_API_KEY", "GOOGLE_AI_API_KEY"),
+    "openai": ("OPENAI_API_KEY",),
+    "claude": ("ANTHROPIC_API_KEY",),
+    "mistral": ("MISTRAL_API_KEY",)
+}
+
+# Cache of finished summaries keyed by text digest, model and canonical options
+# Bump SUMMARY_CACHE_VERSION when prompts or provider models change so stale summaries are never served
+SUMMARY_CACHE_SIZE = 256
+SUMMARY_CACHE_VERSION = "1"
+_summary_cache: "OrderedDict[Tuple[Any, ...], SummarizationResult]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+# Optional near-duplicate lookup: reuse a summary whose source text embeds within this cosine similarity
+SEMANTIC_CACHE_ENABLED = HAS_SENTENCE_TRANSFORMERS and os.environ.get("SEMANTIC_SUMMARY_CACHE", "").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_MODEL = os.environ.get("SEMANTIC_SUMMARY_CACHE_MODEL", "all-MiniLM-L6-v2")
+SEMANTIC_CACHE_THRESHOLD = 0.97
+_semantic_cache: List[Tuple[Tuple[Any, ...], "np.ndarray", SummarizationResult]] = []
+
+def get_http_client() -> "httpx.Client":
+    """
+    Get the shared HTTP client for provider API calls, creating it on first use
+
+    Returns:
+        Process-wide httpx.Client with a keep-alive connection pool
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    timeout=120,
+                    limits=httpx.Limits(max_keepalive_connections=64)
+                )
+    return _http_client
+
+def close_http_client() -> None:
+    """
+    Close the shared HTTP client and its pooled connections
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+def _retry_delay(response: Any, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a response, from Retry-After or exponential backoff
+    """
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return RETRY_BACKOFF * (2 ** attempt)
+
+class ProviderLimiter:
+    """
+    Client-side pacing for one provider: a requests-per-minute token bucket plus an in-flight cap
+    The bucket holds a minute's worth of requests, so bursts go out at once up to the provider's limit
+    The cap and refill rate adapt AIMD-style: halved on a 429, recovered step by step on success
+    """
+
+    def __init__(self, requests_per_minute: int, max_concurrency: int):
+        self.capacity = float(requests_per_minute)
+        self.base_rate = requests_per_minute / 60.0
+        self.rate = self.base_rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def _try_acquire(self) -> float:
+        """
+        Take a token and a slot if both are free, otherwise return the seconds to wait before trying again
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.in_flight >= int(self.concurrency):
+                return 0.05
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= 1
+            self.in_flight += 1
+            return 0.0
+
+    def _release(self, rate_limited: bool) -> None:
+        """
+        Free a slot and adapt the pacing to whether the request was rate limited
+        """
+        with self.lock:
+            self.in_flight -= 1
+            if rate_limited:
+                self.concurrency = max(1.0, self.concurrency / 2)
+                self.rate = max(self.rate / 2, 1 / 60.0)
+                # Drop the saved-up burst so the next requests follow the reduced rate
+                self.tokens = min(self.tokens, 0.0)
+                logger.warning(f"Rate limited, pacing down to {int(self.concurrency)} concurrent requests at {self.rate * 60:.0f} per minute")
+            else:
+                self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+    @contextlib.contextmanager
+    def slot(self):
+        """
+        Hold a request slot for the duration of a blocking provider call
+        """
+        while (wait := self._try_acquire()) > 0:
+            time.sleep(wait)
+        # Release in finally so a cancelled call (CancelledError is not an Exception) frees its slot too
+        rate_limited = False
+        try:
+            yield
+        except Exception as e:
+            rate_limited = _is_rate_limit_error(e)
+            raise
+        finally:
+            self._release(rate_limited)
+
+    @contextlib.asynccontextmanager
+    async def slot_async(self):
+        """
+        Hold a request slot for the duration of an async provider call
+        """
+        while (wait := self._try_acquire()) > 0:
+            await asyncio.sleep(wait)
+        # Release in finally so a cancelled call (CancelledError is not an Exception) frees its slot too
+        rate_limited = False
+        try:
+            yield
+        except Exception as e:
+            rate_limited = _is_rate_limit_error(e)
+            raise
+        finally:
+            self._release(rate_limited)
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check whether a provider call failed with HTTP 429, whichever client library raised it
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None) or getattr(error, "code", None)
+    return status == 429
+
+# Per-process pacing profile for each provider: (requests per minute, max concurrent requests)
+PROVIDER_LIMITS = {
+    "gemini": (60, 8),
+    "openai": (60, 8),
+    "claude": (50, 4),
+    "mistral": (60, 4)
+}
+PROVIDER_LIMITERS = {model: ProviderLimiter(rpm, concurrency) for model, (rpm, concurrency) in PROVIDER_LIMITS.items()}
+
+def _httpx_request(method: str, url: str, stream: bool = False, **kwargs: Any) -> "httpx.Response":
+    """
+    Send a request with the shared httpx client, retrying rate-limit and transient server errors
+    With stream=True the body is left unread and the caller must close the response
+    """
+    client = get_http_client()
+    for attempt in range(MAX_RETRIES + 1):
+        response = client.send(client.build_request(method, url, **kwargs), stream=stream)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        response.close()
+        delay = _retry_delay(response, attempt)
+        logger.warning(f"{url} returned {response.status_code}, retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+async def _httpx_request_async(method: str, url: str, stream: bool = False, **kwargs: Any) -> "httpx.Response":
+    """
+    Send a request with the shared async httpx client, retrying rate-limit and transient server errors
+    With stream=True the body is left unread and the caller must close the response
+    """
+    client = get_async_http_client()
+    for attempt in range(MAX_RETRIES + 1):
+        response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        await response.aclose()
+        delay = _retry_delay(response, attempt)
+        logger.warning(f"{url} returned {response.status_code}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+def _json_body(data: Dict[str, Any]) -> bytes:
+    """
+    Encode a provider request body; callers send it with an explicit Content-Type header
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+def _json_loads(raw: Union[str, bytes]) -> Any:
+    """
+    Decode a provider response body or stream payload
+    """
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _request_body(url: str, headers: Dict[str, str], data: Dict[str, Any]) -> Tuple[Dict[str, str], bytes]:
+    """
+    Encode a provider request body, gzip-compressing it when compression is enabled and worthwhile
+    """
+    body = _json_body(data)
+    if REQUEST_COMPRESSION and len(body) >= REQUEST_COMPRESSION_MIN_BYTES and url not in _uncompressed_urls:
+        return {**headers, "Content-Encoding": "gzip"}, gzip.compress(body, compresslevel=5)
+    return headers, body
+
+def _send_post(url: str, headers: Dict[str, str], body: bytes, stream: bool) -> Any:
+    """
+    POST an encoded body with httpx when available, otherwise with the pooled requests session
+    """
+    if HAS_HTTPX:
+        return _httpx_request("POST", url, stream=stream, headers=headers, content=body, timeout=120)
+    return _requests_session.post(url, headers=headers, data=body, timeout=120, stream=stream)
+
+def _send_json(url: str, headers: Dict[str, str], data: Dict[str, Any], stream: bool = False) -> Any:
+    """
+    POST a JSON body to a provider API, resending it uncompressed if the endpoint rejects gzip
+
+    Args:
+        url: Endpoint URL
+        headers: Request headers
+        data: JSON request body
+        stream: Leave the response body unread for the caller to iterate and close
+
+    Returns:
+        httpx or requests response
+    """
+    send_headers, body = _request_body(url, headers, data)
+    response = _send_post(url, send_headers, body, stream)
+    if response.status_code == 415 and send_headers is not headers:
+        logger.warning(f"{url} rejected a gzip request body, sending uncompressed from now on")
+        _uncompressed_urls.add(url)
+        response.close()
+        response = _send_post(url, headers, _json_body(data), stream)
+    return response
+
+def _post_json(url: str, headers: Dict[str, str], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    POST a JSON request to a provider API and return the decoded JSON response
+
+    Args:
+        url: Endpoint URL
+        headers: Request headers
+        data: JSON request body
+
+    Returns:
+        Decoded JSON response
+    """
+    response = _send_json(url, headers, data)
+    response.raise_for_status()
+    return _json_loads(response.content)
+
+def get_async_http_client() -> "httpx.AsyncClient":
+    """
+    Get the shared async HTTP client for provider API calls, creating it on first use
+    Must be called from the event loop that will use the client
+
+    Returns:
+        Process-wide httpx.AsyncClient with a keep-alive connection pool
+    """
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(
+            timeout=120,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+    return _async_http_client
+
+async def close_async_http_client() -> None:
+    """
+    Close the shared async HTTP client and its pooled connections
+    """
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+
+def _sse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Decode the JSON payloads of a server-sent event stream, stopping at the [DONE] sentinel
+    """
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            return
+        if payload:
+            yield _json_loads(payload)
+
+def _stream_text(url: str, headers: Dict[str, str], data: Dict[str, Any], delta: Callable[[Dict[str, Any]], str]) -> str:
+    """
+    POST a streaming request to a provider API and join the generated text as it arrives
+
+    Args:
+        url: Endpoint URL
+        headers: Request headers
+        data: JSON request body with streaming enabled
+        delta: Extracts the text fragment from one stream event
+
+    Returns:
+        Full generated text
+    """
+    parts = []
+    response = _send_json(url, headers, data, stream=True)
+    try:
+        response.raise_for_status()
+        lines = response.iter_lines()
+        if not HAS_HTTPX:
+            # requests yields raw bytes; event streams are always UTF-8
+            lines = (line.decode("utf-8") for line in lines)
+        for event in _sse_events(lines):
+            parts.append(delta(event))
+    finally:
+        response.close()
+    return "".join(parts)
+
+async def _stream_text_async(url: str, headers: Dict[str, str], data: Dict[str, Any], delta: Callable[[Dict[str, Any]], str]) -> str:
+    """
+    POST a streaming request to a provider API without blocking the event loop
+
+    Args:
+        url: Endpoint URL
+        headers: Request headers
+        data: JSON request body with streaming enabled
+        delta: Extracts the text fragment from one stream event
+
+    Returns:
+        Full generated text
+    """
+    if not HAS_HTTPX:
+        return await asyncio.to_thread(_stream_text, url, headers, data, delta)
+    parts = []
+    send_headers, body = _request_body(url, headers, data)
+    response = await _httpx_request_async("POST", url, stream=True, headers=send_headers, content=body)
+    if response.status_code == 415 and send_headers is not headers:
+        logger.warning(f"{url} rejected a gzip request body, sending uncompressed from now on")
+        _uncompressed_urls.add(url)
+        await response.aclose()
+        response = await _httpx_request_async("POST", url, stream=True, headers=headers, content=_json_body(data))
+    try:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            for event in _sse_events((line,)):
+                parts.append(delta(event))
+    finally:
+        await response.aclose()
+    return "".join(parts)
+
+def _get_json(url: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    GET a provider API resource and return the decoded JSON response
+
+    Args:
+        url: Resource URL
+        headers: Request headers
+
+    Returns:
+        Decoded JSON response
+    """
+    if HAS_HTTPX:
+        response = _httpx_request("GET", url, headers=headers, timeout=120)
+    else:
+        response = _requests_session.get(url, headers=headers, timeout=120)
+    response.raise_for_status()
+    return _json_loads(response.content)
+
+# Control characters (except newline) and problematic special characters, deleted in one str.translate pass
+_CLEAN_TEXT_DELETE_TABLE = str.maketrans('', '', ''.join(
+    [chr(c) for c in range(0x00, 0x0A)] +
+    [chr(c) for c in range(0x0B, 0x20)] +
+    [chr(c) for c in range(0x7F, 0xA0)]
+) + '\\|^~`@#$%&[]{}()<>')
+
+# Patterns used by clean_text, compiled once at import
+_RE_HEADER_HASH_SPACE = re.compile(r'^(#+)([^\s#])', re.MULTILINE)
+_RE_BLANK_BEFORE_HEADER = re.compile(r'([^\n])\n(#+)\s')
+_RE_BLANK_AFTER_HEADER = re.compile(r'(#+\s.*?)\n([^#\n])')
+_RE_HORIZONTAL_SPACE = re.compile(r'[ \t]+')
+_RE_EXTRA_NEWLINES = re.compile(r'\n{3,}')
+_RE_TRAILING_SPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+_RE_BULLET_MARKER = re.compile(r'\s*[•\-]\s*')
+_RE_SENTENCE_LINE_BREAK = re.compile(r'([.!?])\s*\n(?!\n)')
+_RE_BOLD = re.compile(r'\*\*\s*([^*\n]+?)\s*\*\*')
+_RE_UNDERSCORE_BOLD = re.compile(r'__\s*([^_\n]+?)\s*__')
+_RE_ITALIC = re.compile(r'_\s*([^_\n]+?)\s*_')
+_RE_STAR_ITALIC = re.compile(r'\*(?!\*)\s*([^*\n]+?)\s*\*(?!\*)')
+_RE_HEADER_PREFIX = re.compile(r'^\s*(#+)\s*', re.MULTILINE)
+_RE_NEWLINE_AFTER_HEADER = re.compile(r'\n(#+\s[^\n]+)\n(?!\n)')
+_RE_SPACE_AFTER_PUNCT = re.compile(r'([.,;:!?])([^\s0-9])')
+_RE_SPACE_BEFORE_PUNCT = re.compile(r'\s+([.,;:!?])')
+_RE_PARAGRAPH_SPACING = re.compile(r'\s*\n\s*\n\s*')
+
+# Leading markers replaced by '- ' when a section is reformatted as bullet points
+_BULLET_MARKERS = '•-* '
+
+def _format_bullet_section(section: str) -> str:
+    """
+    Turn a multi-line section into '- ' bullet points; a single line (likely a header) is kept as is
+    """
+    if '\n' not in section:
+        return section.strip()
+    return '\n'.join('- ' + line.lstrip(_BULLET_MARKERS).strip() for line in section.split('\n') if line.strip())
+
 def clean_text(text: str, options: SummarizationOptions) -> str:
     """
     Clean text output from AI models to remove special characters and improve formatting
@@ -72,71 +550,71 @@ def clean_text(text: str, options: SummarizationOptions) -> str:
     # Normalize line endings to \n
     text = text.replace('\r\n', '\n').replace('\r', '\n')
 
-    # Remove control characters (except newline)
-    text = re.sub(r'[\x00-\x09\x0B-\x1F\x7F-\x9F]', '', text)
-
-    # Remove problematic special characters while preserving language-specific ones
-    unwanted_chars = r'[\\|\^~`@#\$%&[\]{}()<>]'
-    text = re.sub(unwanted_chars, '', text)
+    # Remove control characters (except newline) and problematic special characters
+    # while preserving language-specific ones
+    text = text.translate(_CLEAN_TEXT_DELETE_TABLE)
 
     # Fix Markdown formatting issues
 
     ## Headers: Ensure space after # and proper line spacing
-    text = re.sub(r'(?m)^(#+)([^\s#])', r'\1 \2', text)  # Space after #
-    text = re.sub(r'([^\n])\n(#+)\s', r'\1\n\n\2 ', text)  # Blank line before headers
-    text = re.sub(r'(#+\s.*?)\n([^#\n])', r'\1\n\n\2', text)  # Blank line after headers
+    text = _RE_HEADER_HASH_SPACE.sub(r'\1 \2', text)  # Space after #
+    text = _RE_BLANK_BEFORE_HEADER.sub(r'\1\n\n\2 ', text)  # Blank line before headers
+    text = _RE_BLANK_AFTER_HEADER.sub(r'\1\n\n\2', text)  # Blank line after headers
 
     # Clean up whitespace
-    text = re.sub(r'[ \t]+', ' ', text)  # Multiple spaces/tabs to single space
-    text = re.sub(r'\n{3,}', '\n\n', text)  # 3+ newlines to 2
-    text = re.sub(r'[ \t]+$', '', text, flags=re.MULTILINE)  # Trailing spaces
+    text = _RE_HORIZONTAL_SPACE.sub(' ', text)  # Multiple spaces/tabs to single space
+    text = _RE_EXTRA_NEWLINES.sub('\n\n', text)  # 3+ newlines to 2
+    text = _RE_TRAILING_SPACE.sub('', text)  # Trailing spaces
 
     # Process based on style
     if style == 'bullet':
-        # Split into sections
-        sections = text.split('\n\n')
-        formatted_sections = []
-
-        for section in sections:
-            lines = section.split('\n')
-            if len(lines) > 1:
-                # Format as bullet points if multiple lines
-                formatted_lines = ['- ' + line.lstrip('•-* ').strip() for line in lines if line.strip()]
-                formatted_sections.append('\n'.join(formatted_lines))
-            else:
-                # Keep as is if it's a single line (likely a header)
-                formatted_sections.append(section.strip())
-
-        text = '\n\n'.join(formatted_sections)
+        # Format each section as bullet points without building intermediate lists
+        text = '\n\n'.join(_format_bullet_section(section) for section in text.split('\n\n'))
     else:
         # For paragraph style
-        text = re.sub(r'\s*[•\-]\s*', '', text)  # Remove bullet points
-        text = re.sub(r'([.!?])\s*\n(?!\n)', r'\1 ', text)  # Join sentences
-        text = re.sub(r'\n{3,}', '\n\n', text)  # Max 2 newlines
+        text = _RE_BULLET_MARKER.sub('', text)  # Remove bullet points
+        text = _RE_SENTENCE_LINE_BREAK.sub(r'\1 ', text)  # Join sentences
+        text = _RE_EXTRA_NEWLINES.sub('\n\n', text)  # Max 2 newlines
 
     # Clean up markdown formatting
-    text = re.sub(r'\*\*\s*([^*\n]+?)\s*\*\*', r'**\1**', text)  # Fix bold
-    text = re.sub(r'__\s*([^_\n]+?)\s*__', r'**\1**', text)  # Convert __ to **
-    text = re.sub(r'_\s*([^_\n]+?)\s*_', r'_\1_', text)  # Fix italics
-    text = re.sub(r'\*(?!\*)\s*([^*\n]+?)\s*\*(?!\*)', r'_\1_', text)  # Convert * to _
+    text = _RE_BOLD.sub(r'**\1**', text)  # Fix bold
+    text = _RE_UNDERSCORE_BOLD.sub(r'**\1**', text)  # Convert __ to **
+    text = _RE_ITALIC.sub(r'_\1_', text)  # Fix italics
+    text = _RE_STAR_ITALIC.sub(r'_\1_', text)  # Convert * to _
 
     # Fix headers
-    text = re.sub(r'^\s*(#+)\s*', r'\1 ', text, flags=re.MULTILINE)  # Fix header spacing
-    text = re.sub(r'\n(#+\s[^\n]+)\n(?!\n)', r'\n\1\n\n', text)  # Add newline after headers
+    text = _RE_HEADER_PREFIX.sub(r'\1 ', text)  # Fix header spacing
+    text = _RE_NEWLINE_AFTER_HEADER.sub(r'\n\1\n\n', text)  # Add newline after headers
 
     # Clean up spacing and punctuation
-    text = re.sub(r'([.,;:!?])([^\s0-9])', r'\1 \2', text)  # Add space after punctuation
-    text = re.sub(r'\s+([.,;:!?])', r'\1', text)  # Remove space before punctuation
-    text = re.sub(r'\s*\n\s*\n\s*', '\n\n', text)  # Normalize paragraph spacing
+    text = _RE_SPACE_AFTER_PUNCT.sub(r'\1 \2', text)  # Add space after punctuation
+    text = _RE_SPACE_BEFORE_PUNCT.sub(r'\1', text)  # Remove space before punctuation
+    text = _RE_PARAGRAPH_SPACING.sub('\n\n', text)  # Normalize paragraph spacing
 
     # Final cleanup
     text = text.strip()
 
     return text
 
+# Full language names by ISO language code
+LANGUAGE_NAMES = {
+    'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German', 'it': 'Italian',
+    'pt': 'Portuguese', 'nl': 'Dutch', 'ru': 'Russian', 'pl': 'Polish', 'sv': 'Swedish',
+    'da': 'Danish', 'no': 'Norwegian', 'fi': 'Finnish', 'cs': 'Czech', 'hu': 'Hungarian',
+    'ro': 'Romanian', 'bg': 'Bulgarian', 'el': 'Greek', 'tr': 'Turkish', 'zh': 'Chinese',
+    'ja': 'Japanese', 'ko': 'Korean', 'vi': 'Vietnamese', 'th': 'Thai', 'id': 'Indonesian',
+    'ms': 'Malay', 'hi': 'Hindi', 'bn': 'Bengali', 'mr': 'Marathi', 'te': 'Telugu',
+    'ta': 'Tamil', 'gu': 'Gujarati', 'kn': 'Kannada', 'ml': 'Malayalam', 'pa': 'Punjabi',
+    'or': 'Odia', 'as': 'Assamese', 'ur': 'Urdu', 'sa': 'Sanskrit', 'ar': 'Arabic',
+    'he': 'Hebrew', 'fa': 'Persian', 'sw': 'Swahili', 'am': 'Amharic', 'ha': 'Hausa',
+    'yo': 'Yoruba', 'ig': 'Igbo'
+}
+
+@functools.lru_cache(maxsize=64)
 def get_language_name(language_code: str) -> str:
     """
     Get the full language name from a language code
+    Cached, so the language is logged once per code rather than on every prompt
 
     Args:
         language_code: ISO language code (e.g., 'en', 'hi', 'es')
@@ -144,66 +622,30 @@ def get_language_name(language_code: str) -> str:
     Returns:
         Full language name
     """
-    language_map = {
-        'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German', 'it': 'Italian',
-        'pt': 'Portuguese', 'nl': 'Dutch', 'ru': 'Russian', 'pl': 'Polish', 'sv': 'Swedish',
-        'da': 'Danish', 'no': 'Norwegian', 'fi': 'Finnish', 'cs': 'Czech', 'hu': 'Hungarian',
-        'ro': 'Romanian', 'bg': 'Bulgarian', 'el': 'Greek', 'tr': 'Turkish', 'zh': 'Chinese',
-        'ja': 'Japanese', 'ko': 'Korean', 'vi': 'Vietnamese', 'th': 'Thai', 'id': 'Indonesian',
-        'ms': 'Malay', 'hi': 'Hindi', 'bn': 'Bengali', 'mr': 'Marathi', 'te': 'Telugu',
-        'ta': 'Tamil', 'gu': 'Gujarati', 'kn': 'Kannada', 'ml': 'Malayalam', 'pa': 'Punjabi',
-        'or': 'Odia', 'as': 'Assamese', 'ur': 'Urdu', 'sa': 'Sanskrit', 'ar': 'Arabic',
-        'he': 'Hebrew', 'fa': 'Persian', 'sw': 'Swahili', 'am': 'Amharic', 'ha': 'Hausa',
-        'yo': 'Yoruba', 'ig': 'Igbo'
-    }
-
-    if language_code in language_map:
-        logger.info(f"Using language: {language_map[language_code]} ({language_code})")
+    if language_code in LANGUAGE_NAMES:
+        logger.info(f"Using language: {LANGUAGE_NAMES[language_code]} ({language_code})")
     else:
         logger.warning(f"Unknown language code: {language_code}, using as is")
-    return language_map.get(language_code, language_code)
-
-def generate_prompt(text: str, options: SummarizationOptions) -> str:
-    """
-    Generate a prompt for the AI model based on the extracted text and options
-
-    Args:
-        text: Text to summarize
-        options: Summarization options
-
-    Returns:
-        Prompt for the AI model
-    """
-    length = options.get('length', 'medium')
-    style = options.get('style', 'paragraph')
-    focus = options.get('focus', 'comprehensive')
-    language = options.get('language', 'en')
-
-    language_name = get_language_name(language)
-    length_map = {
-        'short': 'concise (approximately 150-250 words)',
-        'medium': 'moderate length (approximately 400-600 words)',
-        'long': 'detailed and extensive (approximately 1000-1500 words)'
-    }
-    style_map = {
-        'bullet': 'organized bullet points with clear sections and subsections (use proper Markdown bullet point format with - or * followed by a space)',
-        'paragraph': 'well-structured paragraphs with clear transitions and sections'
-    }
-    focus_map = {
-        'comprehensive': 'all key aspects and important details of the document',
-        'methods': 'processes, procedures, methods, or technical details',
-        'results': 'outcomes, achievements, findings, or key points',
-        'conclusions': 'conclusions, implications, or final takeaways'
-    }
-
-    language_instruction = (
-        f"IMPORTANT: Write the ENTIRE summary in {language_name} language. Do NOT use English at all, "
-        f"translate everything including headers and technical terms to {language_name}."
-        if language != 'en' else "Output in English"
-    )
-
-    style_specific_instructions = (
-        """
+    return LANGUAGE_NAMES.get(language_code, language_code)
+
+# Prompt fragments for each summarization option
+PROMPT_LENGTHS = {
+    'short': 'concise (approximately 150-250 words)',
+    'medium': 'moderate length (approximately 400-600 words)',
+    'long': 'detailed and extensive (approximately 1000-1500 words)'
+}
+PROMPT_STYLES = {
+    'bullet': 'organized bullet points with clear sections and subsections (use proper Markdown bullet point format with - or * followed by a space)',
+    'paragraph': 'well-structured paragraphs with clear transitions and sections'
+}
+PROMPT_FOCUSES = {
+    'comprehensive': 'all key aspects and important details of the document',
+    'methods': 'processes, procedures, methods, or technical details',
+    'results': 'outcomes, achievements, findings, or key points',
+    'conclusions': 'conclusions, implications, or final takeaways'
+}
+
+BULLET_STYLE_INSTRUCTIONS = """
 - Use bullet points consistently throughout the summary
 - Format each main point as a bullet point starting with '- ' (dash followed by a space)
 - Use indentation for sub-points where appropriate (4 spaces followed by '- ')
@@ -211,21 +653,42 @@ def generate_prompt(text: str, options: SummarizationOptions) -> str:
 - Use headers to organize sections (# for main sections, ## for subsections), followed by bullet points
 - IMPORTANT: Always use proper Markdown bullet point format (dash or asterisk followed by a space)
 - IMPORTANT: Make sure each bullet point appears on a new line"""
-        if style == 'bullet' else
-        """
+
+PARAGRAPH_STYLE_INSTRUCTIONS = """
 - Use well-structured paragraphs with clear topic sentences
 - Ensure smooth transitions between paragraphs
 - Group related information in the same paragraph
 - Use headers to separate major sections (# for main sections, ## for subsections)
 - IMPORTANT: Include at least 3-4 paragraphs for short summaries, 5-7 for medium, and 8-12 for long summaries"""
+
+@functools.lru_cache(maxsize=128)
+def _prompt_header(length: str, style: str, focus: str, language: str) -> str:
+    """
+    Build the part of the prompt before the document text, which depends only on the options
+
+    Args:
+        length: Summary length option
+        style: Summary style option
+        focus: Summary focus option
+        language: Output language code
+
+    Returns:
+        Prompt text up to and including the DOCUMENT TEXT: line
+    """
+    language_name = get_language_name(language)
+    language_instruction = (
+        f"IMPORTANT: Write the ENTIRE summary in {language_name} language. Do NOT use English at all, "
+        f"translate everything including headers and technical terms to {language_name}."
+        if language != 'en' else "Output in English"
     )
+    style_specific_instructions = BULLET_STYLE_INSTRUCTIONS if style == 'bullet' else PARAGRAPH_STYLE_INSTRUCTIONS
 
-    prompt = f"""
-You are an expert document summarizer. Your task is to create a high-quality {length_map.get(length, 'moderate length')} summary of the following document. The document could be any type: research paper, article, certificate, report, presentation, or other text.
+    return f"""
+You are an expert document summarizer. Your task is to create a high-quality {PROMPT_LENGTHS.get(length, 'moderate length')} summary of the following document. The document could be any type: research paper, article, certificate, report, presentation, or other text.
 
 SUMMARY REQUIREMENTS:
-- Use {style_map.get(style, 'well-structured paragraphs')} for the summary format
-- Focus primarily on {focus_map.get(focus, 'all key aspects of the research')}
+- Use {PROMPT_STYLES.get(style, 'well-structured paragraphs')} for the summary format
+- Focus primarily on {PROMPT_FOCUSES.get(focus, 'all key aspects of the research')}
 - {language_instruction}
 - Organize the summary with clear structure
 - Preserve key statistics, findings, and citations
@@ -245,9 +708,48 @@ IMPORTANT LANGUAGE REQUIREMENT:
 {language_instruction}
 
 DOCUMENT TEXT:
-{text}
 """
-    return prompt
+
+def _options_key(options: SummarizationOptions) -> Tuple[str, str, str, str, str]:
+    """
+    Extract the options that affect a summary, with their defaults, as a hashable key
+
+    Args:
+        options: Summarization options
+
+    Returns:
+        (length, style, focus, language, subscription_tier)
+    """
+    return (
+        options.get('length', 'medium'),
+        options.get('style', 'paragraph'),
+        options.get('focus', 'comprehensive'),
+        options.get('language', 'en'),
+        options.get('subscription_tier', 'basic')
+    )
+
+def generate_prompt(text: str, options: SummarizationOptions) -> str:
+    """
+    Generate a prompt for the AI model based on the extracted text and options
+
+    Args:
+        text: Text to summarize
+        options: Summarization options
+
+    Returns:
+        Prompt for the AI model
+    """
+    length, style, focus, language, _ = _options_key(options)
+    header = _prompt_header(length, style, focus, language)
+    return "".join((header, text, "\n"))
+
+@functools.lru_cache(maxsize=4)
+def _get_gemini_model(api_key: str) -> "genai.GenerativeModel":
+    """
+    Configure the Gemini library and build the summarization model once per API key
+    """
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-1.5-flash')
 
 def summarize_with_gemini(text: str, options: SummarizationOptions) -> SummarizationResult:
     """
@@ -270,10 +772,10 @@ def summarize_with_gemini(text: str, options: SummarizationOptions) -> Summariza
             api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_AI_API_KEY")
             if not api_key:
                 raise ValueError("Neither GEMINI_API_KEY nor GOOGLE_AI_API_KEY environment variables are set")
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            model = _get_gemini_model(api_key)
             prompt = generate_prompt(text, options)
-            response = model.generate_content(prompt)
+            with PROVIDER_LIMITERS["gemini"].slot():
+                response = model.generate_content(prompt)
             summary = response.text
         except Exception as e:
             logger.error(f"Error using Gemini API: {str(e)}", exc_info=True)
@@ -282,6 +784,96 @@ def summarize_with_gemini(text: str, options: SummarizationOptions) -> Summariza
     cleaned_summary = clean_text(summary, options)
     return {"summary": cleaned_summary, "model": "gemini", "processing_time": processing_time}
 
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_BATCH_MODEL = "gemini-2.5-flash"
+
+def summarize_with_gemini_batch(
+    items: List[Tuple[str, SummarizationOptions]],
+    poll_interval: float = 30,
+    timeout: float = 24 * 60 * 60
+) -> List[SummarizationResult]:
+    """
+    Summarize many texts in one Gemini Batch Mode job
+    Batch jobs are billed at half the interactive price but complete asynchronously
+    (minutes to hours), so this is meant for offline bulk work, not request handling.
+    Requests are sent inline, which the API limits to about 20 MB in total.
+
+    Args:
+        items: (text, options) pairs to summarize
+        poll_interval: Initial seconds between job status checks, doubled up to 10 minutes
+        timeout: Seconds to wait for the job before giving up
+
+    Returns:
+        One result per item, in order; failed items carry "error": True
+    """
+    start_time = time.time()
+    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_AI_API_KEY")
+    if not api_key:
+        raise ValueError("Neither GEMINI_API_KEY nor GOOGLE_AI_API_KEY environment variables are set")
+    headers = {"x-goog-api-key": api_key, "Content-Type": "application/json"}
+
+    requests_list = [
+        {
+            "request": {"contents": [{"parts": [{"text": generate_prompt(text, options)}]}]},
+            "metadata": {"key": f"req_{i}"}
+        }
+        for i, (text, options) in enumerate(items)
+    ]
+    job = _post_json(
+        f"{GEMINI_API_BASE}/models/{GEMINI_BATCH_MODEL}:batchGenerateContent",
+        headers,
+        {"batch": {
+            "display_name": f"summaries-{int(start_time)}",
+            "input_config": {"requests": {"requests": requests_list}}
+        }}
+    )
+    job_name = job["name"]
+    logger.info(f"Submitted Gemini batch job {job_name} with {len(items)} requests")
+
+    # Poll with exponential backoff until the job reaches a terminal state
+    delay = poll_interval
+    while not job.get("done"):
+        if time.time() - start_time > timeout:
+            raise TimeoutError(f"Gemini batch job {job_name} did not finish within {timeout} seconds")
+        time.sleep(delay)
+        delay = min(delay * 2, 600)
+        job = _get_json(f"{GEMINI_API_BASE}/{job_name}", headers)
+
+    if "error" in job:
+        raise ValueError(f"Gemini batch job {job_name} failed: {job['error'].get('message', job['error'])}")
+
+    inlined = job.get("response", {}).get("inlinedResponses", [])
+    if isinstance(inlined, dict):
+        inlined = inlined.get("inlinedResponses", [])
+    responses = {entry.get("metadata", {}).get("key"): entry for entry in inlined}
+
+    processing_time = time.time() - start_time
+    results = []
+    for i, (_, options) in enumerate(items):
+        entry = responses.get(f"req_{i}", {})
+        try:
+            if "error" in entry:
+                raise ValueError(entry["error"].get("message", entry["error"]))
+            parts = entry["response"]["candidates"][0]["content"]["parts"]
+            summary = "".join(part.get("text", "") for part in parts)
+            results.append({"summary": clean_text(summary, options), "model": "gemini", "processing_time": processing_time})
+        except Exception as e:
+            logger.error(f"Gemini batch item req_{i} failed: {str(e)}")
+            results.append({
+                "summary": f"Summarization failed: Gemini batch item failed: {str(e)}",
+                "model": "gemini",
+                "processing_time": processing_time,
+                "error": True
+            })
+    return results
+
+@functools.lru_cache(maxsize=4)
+def _get_openai_client(api_key: str) -> "openai.OpenAI":
+    """
+    Build the OpenAI client once per API key so its connection pool is reused between requests
+    """
+    return openai.OpenAI(api_key=api_key)
+
 def summarize_with_openai(text: str, options: SummarizationOptions) -> SummarizationResult:
     """
     Summarize text using OpenAI models
@@ -303,19 +895,22 @@ def summarize_with_openai(text: str, options: SummarizationOptions) -> Summariza
             api_key = os.environ.get("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY environment variable not set")
-            client = openai.OpenAI(api_key=api_key)
+            client = _get_openai_client(api_key)
             prompt = generate_prompt(text, options)
             model = "gpt-4o-2024-05-13"
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are an expert scientific research summarizer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2500
-            )
-            summary = response.choices[0].message.content
+            # Stream the completion so tokens are received while the model is still generating
+            with PROVIDER_LIMITERS["openai"].slot():
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are an expert scientific research summarizer."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=2500,
+                    stream=True
+                )
+                summary = "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
         except Exception as e:
             logger.error(f"Error using OpenAI API: {str(e)}", exc_info=True)
             raise ValueError(f"OpenAI summarization failed: {str(e)}")
@@ -323,6 +918,108 @@ def summarize_with_openai(text: str, options: SummarizationOptions) -> Summariza
     cleaned_summary = clean_text(summary, options)
     return {"summary": cleaned_summary, "model": "openai", "processing_time": processing_time}
 
+CLAUDE_API_URL = "https://api.anthropic.com/v1/messages"
+MISTRAL_API_URL = "https://api.mistral.ai/v1/chat/completions"
+
+def _claude_request(text: str, options: SummarizationOptions) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Build the headers and body of a Claude summarization request
+    """
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+
+    prompt = generate_prompt(text, options)
+    model = "claude-3-opus-20240229"
+
+    # Direct API call to Claude
+    headers = {
+        "x-api-key": api_key,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json"
+    }
+
+    data = {
+        "model": model,
+        "max_tokens": 2500,
+        "temperature": 0.3,
+        "system": "You are an expert document summarizer, capable of analyzing and summarizing any type of document.",
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": True
+    }
+    return headers, data
+
+def _mistral_request(text: str, options: SummarizationOptions) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Build the headers and body of a Mistral summarization request
+    """
+    api_key = os.environ.get("MISTRAL_API_KEY")
+    if not api_key:
+        raise ValueError("MISTRAL_API_KEY environment variable not set")
+
+    prompt = generate_prompt(text, options)
+    model = "mistral-large-latest"
+
+    # Direct API call to Mistral
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    data = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": "You are an expert document summarizer, capable of analyzing and summarizing any type of document."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.3,
+        "max_tokens": 2500,
+        "stream": True
+    }
+    return headers, data
+
+def _claude_delta(event: Dict[str, Any]) -> str:
+    """
+    Extract the text fragment from a Claude stream event
+    """
+    if event.get("type") == "error":
+        raise ValueError(event.get("error", {}).get("message", "Claude stream error"))
+    if event.get("type") == "content_block_delta":
+        return event["delta"].get("text", "")
+    return ""
+
+def _mistral_delta(event: Dict[str, Any]) -> str:
+    """
+    Extract the text fragment from a Mistral stream chunk
+    """
+    choices = event.get("choices")
+    if not choices:
+        return ""
+    return choices[0].get("delta", {}).get("content") or ""
+
+def _api_summary_result(model: str, summary: str, options: SummarizationOptions, start_time: float) -> SummarizationResult:
+    """
+    Build the result of a successful direct API summarization
+    """
+    return {
+        "summary": clean_text(summary, options),
+        "model": model,
+        "processing_time": time.time() - start_time
+    }
+
+def _api_summary_error(model: str, error: Exception, start_time: float) -> SummarizationResult:
+    """
+    Log a failed direct API summarization and build its error result
+    """
+    error_msg = f"{model.capitalize()} summarization failed: {str(error)}"
+    logger.error(error_msg, exc_info=True)
+    return {
+        "summary": f"Summarization failed: {error_msg}",
+        "model": model,
+        "processing_time": time.time() - start_time,
+        "error": True
+    }
+
 def summarize_with_claude(text: str, options: SummarizationOptions) -> SummarizationResult:
     """
     Summarize text using Anthropic Claude models
@@ -336,54 +1033,32 @@ def summarize_with_claude(text: str, options: SummarizationOptions) -> Summariza
     """
     start_time = time.time()
     try:
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-
-        prompt = generate_prompt(text, options)
-        model = "claude-3-opus-20240229"
-
-        # Direct API call to Claude
-        headers = {
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        }
+        headers, data = _claude_request(text, options)
+        with PROVIDER_LIMITERS["claude"].slot():
+            summary = _stream_text(CLAUDE_API_URL, headers, data, _claude_delta)
+        return _api_summary_result("claude", summary, options, start_time)
+    except Exception as e:
+        return _api_summary_error("claude", e, start_time)
 
-        data = {
-            "model": model,
-            "max_tokens": 2500,
-            "temperature": 0.3,
-            "system": "You are an expert document summarizer, capable of analyzing and summarizing any type of document.",
-            "messages": [{"role": "user", "content": prompt}]
-        }
+async def summarize_with_claude_async(text: str, options: SummarizationOptions) -> SummarizationResult:
+    """
+    Summarize text using Anthropic Claude models without blocking the event loop
 
-        response = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers=headers,
-            json=data,
-            timeout=120
-        )
-        response.raise_for_status()
-        result = response.json()
-        summary = result["content"][0]["text"]
-        cleaned_summary = clean_text(summary, options)
-
-        return {
-            "summary": cleaned_summary,
-            "model": "claude",
-            "processing_time": time.time() - start_time
-        }
+    Args:
+        text: Text to summarize
+        options: Summarization options
 
+    Returns:
+        Dict containing summary and processing time
+    """
+    start_time = time.time()
+    try:
+        headers, data = _claude_request(text, options)
+        async with PROVIDER_LIMITERS["claude"].slot_async():
+            summary = await _stream_text_async(CLAUDE_API_URL, headers, data, _claude_delta)
+        return _api_summary_result("claude", summary, options, start_time)
     except Exception as e:
-        error_msg = f"Claude summarization failed: {str(e)}"
-        logger.error(error_msg, exc_info=True)
-        return {
-            "summary": f"Summarization failed: {error_msg}",
-            "model": "claude",
-            "processing_time": time.time() - start_time,
-            "error": True
-        }
+        return _api_summary_error("claude", e, start_time)
 
 def summarize_with_mistral(text: str, options: SummarizationOptions) -> SummarizationResult:
     """
@@ -398,55 +1073,221 @@ def summarize_with_mistral(text: str, options: SummarizationOptions) -> Summariz
     """
     start_time = time.time()
     try:
-        api_key = os.environ.get("MISTRAL_API_KEY")
-        if not api_key:
-            raise ValueError("MISTRAL_API_KEY environment variable not set")
+        headers, data = _mistral_request(text, options)
+        with PROVIDER_LIMITERS["mistral"].slot():
+            summary = _stream_text(MISTRAL_API_URL, headers, data, _mistral_delta)
+        return _api_summary_result("mistral", summary, options, start_time)
+    except Exception as e:
+        return _api_summary_error("mistral", e, start_time)
 
-        prompt = generate_prompt(text, options)
-        model = "mistral-large-latest"
+async def summarize_with_mistral_async(text: str, options: SummarizationOptions) -> SummarizationResult:
+    """
+    Summarize text using Mistral AI models without blocking the event loop
 
-        # Direct API call to Mistral
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+    Args:
+        text: Text to summarize
+        options: Summarization options
 
-        data = {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": "You are an expert document summarizer, capable of analyzing and summarizing any type of document."},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.3,
-            "max_tokens": 2500
-        }
+    Returns:
+        Dict containing summary and processing time
+    """
+    start_time = time.time()
+    try:
+        headers, data = _mistral_request(text, options)
+        async with PROVIDER_LIMITERS["mistral"].slot_async():
+            summary = await _stream_text_async(MISTRAL_API_URL, headers, data, _mistral_delta)
+        return _api_summary_result("mistral", summary, options, start_time)
+    except Exception as e:
+        return _api_summary_error("mistral", e, start_time)
+
+# Summarizer function for each supported model
+SUMMARIZERS = {
+    "gemini": summarize_with_gemini,
+    "openai": summarize_with_openai,
+    "claude": summarize_with_claude,
+    "mistral": summarize_with_mistral
+}
+
+# Native async summarizers; models without one run their sync summarizer in a thread
+ASYNC_SUMMARIZERS = {
+    "claude": summarize_with_claude_async,
+    "mistral": summarize_with_mistral_async
+}
+
+async def summarize_with_model_async(model: str, text: str, options: SummarizationOptions) -> SummarizationResult:
+    """
+    Summarize text with a supported model from async code
 
-        response = requests.post(
-            "https://api.mistral.ai/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=120
-        )
-        response.raise_for_status()
-        result = response.json()
-        summary = result["choices"][0]["message"]["content"]
-        cleaned_summary = clean_text(summary, options)
-
-        return {
-            "summary": cleaned_summary,
-            "model": "mistral",
-            "processing_time": time.time() - start_time
-        }
+    Args:
+        model: AI model to use (gemini, openai, claude, mistral)
+        text: Text to summarize
+        options: Summarization options
 
-    except Exception as e:
-        error_msg = f"Mistral summarization failed: {str(e)}"
-        logger.error(error_msg, exc_info=True)
-        return {
-            "summary": f"Summarization failed: {error_msg}",
-            "model": "mistral",
-            "processing_time": time.time() - start_time,
-            "error": True
-        }
+    Returns:
+        Result of the model's summarizer
+    """
+    async_fn = ASYNC_SUMMARIZERS.get(model)
+    if async_fn is not None:
+        return await async_fn(text, options)
+    return await asyncio.to_thread(SUMMARIZERS[model], text, options)
+
+async def summarize_many_async(items: List[Tuple[str, str, SummarizationOptions]]) -> List[SummarizationResult]:
+    """
+    Summarize several texts concurrently
+
+    Args:
+        items: (model, text, options) tuples
+
+    Returns:
+        Results in the same order as items
+    """
+    return await asyncio.gather(*(summarize_with_model_async(model, text, options) for model, text, options in items))
+
+def _summary_cache_scope(model: str, options: SummarizationOptions) -> Tuple[Any, ...]:
+    """
+    Build the part of a summary cache key shared by every text: cache version, model and option key
+    """
+    return (SUMMARY_CACHE_VERSION, model, _options_key(options))
+
+def _summary_cache_key(scope: Tuple[Any, ...], text: str) -> Tuple[Any, ...]:
+    """
+    Build a summary cache key from its scope and the text's SHA-256 digest
+    """
+    return (scope, hashlib.sha256(text.encode('utf-8')).digest())
+
+def _summary_cache_get(key: Tuple[Any, ...]) -> Optional[SummarizationResult]:
+    """
+    Look up a cached summary, marking it as recently used
+    """
+    with _summary_cache_lock:
+        result = _summary_cache.get(key)
+        if result is not None:
+            _summary_cache.move_to_end(key)
+        return result
+
+def _summary_cache_put(key: Tuple[Any, ...], result: SummarizationResult) -> None:
+    """
+    Store a summary, evicting the least recently used entry when full
+    """
+    with _summary_cache_lock:
+        _summary_cache[key] = result
+        _summary_cache.move_to_end(key)
+        if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+
+@functools.lru_cache(maxsize=1)
+def _get_semantic_cache_model() -> "SentenceTransformer":
+    """
+    Load the sentence embedding model used by the semantic summary cache on first use
+    """
+    return SentenceTransformer(SEMANTIC_CACHE_MODEL)
+
+def _embed_for_cache(text: str) -> "np.ndarray":
+    """
+    Embed text as a unit vector so cosine similarity is a dot product
+    """
+    return _get_semantic_cache_model().encode(text, normalize_embeddings=True)
+
+def _semantic_cache_get(scope: Tuple[Any, ...], embedding: "np.ndarray") -> Optional[SummarizationResult]:
+    """
+    Find the cached summary whose source text is most similar to the embedding within the same model and options
+    """
+    with _summary_cache_lock:
+        candidates = [(cached, result) for cached_scope, cached, result in _semantic_cache if cached_scope == scope]
+    if not candidates:
+        return None
+    similarities = np.stack([cached for cached, _ in candidates]) @ embedding
+    best = int(np.argmax(similarities))
+    if similarities[best] < SEMANTIC_CACHE_THRESHOLD:
+        return None
+    logger.info(f"Semantic summary cache hit (similarity {similarities[best]:.3f})")
+    return candidates[best][1]
+
+def _semantic_cache_put(scope: Tuple[Any, ...], embedding: "np.ndarray", result: SummarizationResult) -> None:
+    """
+    Store a summary for near-duplicate lookup, dropping the oldest entry when full
+    """
+    with _summary_cache_lock:
+        _semantic_cache.append((scope, embedding, result))
+        if len(_semantic_cache) > SUMMARY_CACHE_SIZE:
+            _semantic_cache.pop(0)
+
+# Input budget for the document text: the head third and tail two thirds are kept when it is exceeded
+MAX_INPUT_TOKENS = 8000
+# Without tiktoken, tokens are estimated from UTF-8 bytes, which tracks non-Latin scripts far better than characters
+BYTES_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n\n[...Content truncated due to length...]\n\n"
+
+@functools.lru_cache(maxsize=1)
+def _get_token_encoding() -> "tiktoken.Encoding":
+    """
+    Load the tokenizer used to measure document length on first use
+    """
+    return tiktoken.get_encoding("cl100k_base")
+
+def truncate_text(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
+    """
+    Shorten text to the input budget, keeping its beginning and end
+
+    Args:
+        text: Document text
+        max_tokens: Token budget for the text
+
+    Returns:
+        The text unchanged if it fits, otherwise its head and tail joined by a truncation marker
+    """
+    first_part = int(max_tokens * 0.33)
+    last_part = max_tokens - first_part
+
+    # Every token spans at least one character, so short text fits without measuring it
+    if len(text) <= max_tokens:
+        return text
+
+    if not HAS_TIKTOKEN:
+        max_bytes = max_tokens * BYTES_PER_TOKEN
+        data = text.encode("utf-8")
+        if len(data) <= max_bytes:
+            return text
+        logger.warning(f"Text exceeds maximum length ({len(data)} bytes). Truncating to {max_bytes} bytes.")
+        first_bytes = first_part * BYTES_PER_TOKEN
+        # Cuts that land inside a multi-byte character drop the partial character
+        head = data[:first_bytes].decode("utf-8", "ignore")
+        tail = data[-(max_bytes - first_bytes):].decode("utf-8", "ignore")
+        return "".join((head, TRUNCATION_MARKER, tail))
+
+    # Only the ends can be kept, so very long text is trimmed before tokenizing (tokens rarely exceed 16 chars)
+    window = max_tokens * 16
+    if len(text) > 2 * window:
+        text = "".join((text[:window], "\n", text[-window:]))
+    encoding = _get_token_encoding()
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    logger.warning(f"Text exceeds maximum length ({len(tokens)} tokens). Truncating to {max_tokens} tokens.")
+    return "".join((encoding.decode(tokens[:first_part]), TRUNCATION_MARKER, encoding.decode(tokens[-last_part:])))
+
+def is_model_configured(model: str) -> bool:
+    """
+    Check whether a model can be used without failing on missing configuration
+
+    Args:
+        model: AI model name (gemini, openai, claude, mistral)
+
+    Returns:
+        True if the model is supported and its API key is set
+    """
+    model = model.lower()
+    # Gemini and OpenAI return mock summaries when their library is not installed
+    if (model == "gemini" and not HAS_GEMINI) or (model == "openai" and not HAS_OPENAI):
+        return True
+    return any(os.environ.get(var) for var in MODEL_API_KEY_VARS.get(model, ()))
+
+# Models each subscription tier may use
+TIER_MODELS = {
+    'basic': frozenset({'gemini'}),
+    'silver': frozenset({'gemini', 'openai', 'mistral'}),
+    'gold': frozenset({'gemini', 'openai', 'mistral', 'claude'})
+}
 
 def summarize_text(text: str, model: str, options: SummarizationOptions) -> SummarizationResult:
     """
@@ -461,27 +1302,18 @@ def summarize_text(text: str, model: str, options: SummarizationOptions) -> Summ
         Dict containing summary and processing time
     """
     model = model.lower()
-    if not text or len(text.strip()) < 50:
-        raise ValueError("Text is too short for summarization")
     
     # Check user's subscription tier if provided
     user_tier = options.get('subscription_tier', 'basic')
     logger.info(f"User subscription tier: {user_tier}")
     
-    # Validate model access based on subscription tier
-    allowed_models = {
-        'basic': ['gemini'],
-        'silver': ['gemini', 'openai', 'mistral'],
-        'gold': ['gemini', 'openai', 'mistral', 'claude']
-    }
-    
     # Default to basic tier if invalid tier provided
-    if user_tier not in allowed_models:
+    if user_tier not in TIER_MODELS:
         logger.warning(f"Invalid subscription tier: {user_tier}. Defaulting to 'basic'")
         user_tier = 'basic'
     
     # Check if user has access to the requested model
-    if model not in allowed_models[user_tier]:
+    if model not in TIER_MODELS[user_tier]:
         logger.warning(f"User with {user_tier} tier doesn't have access to {model} model")
         # Fallback to the best available model for their tier
         if user_tier == 'basic':
@@ -492,30 +1324,62 @@ def summarize_text(text: str, model: str, options: SummarizationOptions) -> Summ
         
         logger.info(f"Falling back to {model} model based on subscription tier")
     
+    return summarize_with_cache(text, model, options)
+
+def summarize_with_cache(text: str, model: str, options: SummarizationOptions) -> SummarizationResult:
+    """
+    Summarize text with the given model, without a subscription tier check
+
+    Truncates the text and serves repeated requests from the summary caches.
+
+    Args:
+        text: Text to summarize
+        model: AI model to use (gemini, openai, claude, mistral)
+        options: Summarization options
+
+    Returns:
+        Dict containing summary and processing time
+    """
+    model = model.lower()
+    if not text or len(text.strip()) < 50:
+        raise ValueError("Text is too short for summarization")
+    
     # Truncate text if too long
-    max_chars = 32000
-    if len(text) > max_chars:
-        logger.warning(f"Text exceeds maximum length ({len(text)} chars). Truncating to {max_chars} chars.")
-        first_part = int(max_chars * 0.33)
-        last_part = max_chars - first_part
-        text = text[:first_part] + "\n\n[...Content truncated due to length...]\n\n" + text[-last_part:]
+    text = truncate_text(text)
     
+    # Identical text, model and options return the cached summary without an API call
+    scope = _summary_cache_scope(model, options)
+    cache_key = _summary_cache_key(scope, text)
+    cached = _summary_cache_get(cache_key)
+    if cached is not None:
+        logger.info(f"Returning cached {model} summary")
+        return cached
+
+    # Near-duplicate text (e.g. a re-upload with minor edits) can reuse a summary with the same model and options
+    embedding = None
+    if SEMANTIC_CACHE_ENABLED:
+        embedding = _embed_for_cache(text)
+        cached = _semantic_cache_get(scope, embedding)
+        if cached is not None:
+            return cached
+
     logger.info(f"Summarizing with {model} model")
     try:
-        if model == "gemini":
-            return summarize_with_gemini(text, options)
-        elif model == "openai":
-            return summarize_with_openai(text, options)
-        elif model == "claude":
-            return summarize_with_claude(text, options)
-        elif model == "mistral":
-            return summarize_with_mistral(text, options)
-        else:
+        summarizer = SUMMARIZERS.get(model)
+        if summarizer is None:
             raise ValueError(f"Unsupported AI model: {model}")
+        result = summarizer(text, options)
     except Exception as e:
         logger.error(f"Error in {model} summarization: {str(e)}", exc_info=True)
         raise ValueError(f"{model.capitalize()} summarization failed: {str(e)}")
 
+    # Error results are not cached so a transient provider failure can be retried
+    if not result.get("error"):
+        _summary_cache_put(cache_key, result)
+        if embedding is not None:
+            _semantic_cache_put(scope, embedding, result)
+    return result
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description='Summarize text using AI models')
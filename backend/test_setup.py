@@ -3,51 +3,53 @@ Test script to verify the installation of required packages
 """
 
 import sys
-import importlib
+import importlib.util
 import importlib.metadata
+from concurrent.futures import ThreadPoolExecutor
+
+def is_installed(package_name):
+    # Locate the package without executing it; a dotted name still imports its parent package
+    try:
+        return importlib.util.find_spec(package_name) is not None
+    except (ImportError, ValueError):
+        return False
 
 def check_package(package_name):
+    if not is_installed(package_name):
+        return f"[MISSING] {package_name} (Not installed)"
     try:
-        importlib.import_module(package_name)
-        try:
-            version = importlib.metadata.version(package_name)
-            return f"[INSTALLED] {package_name} ({version})"
-        except importlib.metadata.PackageNotFoundError:
-            return f"[INSTALLED] {package_name} (version unknown)"
-    except ImportError:
+        version = importlib.metadata.version(package_name)
+        return f"[INSTALLED] {package_name} ({version})"
+    except importlib.metadata.PackageNotFoundError:
+        return f"[INSTALLED] {package_name} (version unknown)"
+
+def check_import(package_name):
+    if not is_installed(package_name):
         return f"[MISSING] {package_name} (Not installed)"
+    return f"[INSTALLED] {package_name}"
+
+# (heading, packages, checker, indent) for each group of packages, printed in this order
+PACKAGE_GROUPS = [
+    ("Core packages:", ["fastapi", "uvicorn", "pydantic", "requests", "dotenv"], check_package, "  "),
+    ("\nDocument processing packages:", ["PyPDF2", "pdfplumber", "pdf2image", "pytesseract",
+                                         "docx", "odf", "pandas", "openpyxl", "bs4", "html2text", "PIL"], check_package, "  "),
+    ("\nAI packages:", ["google.generativeai", "openai", "anthropic", "mistralai"], check_import, ""),
+    ("\nUtility packages:", ["aiofiles", "jose", "tenacity"], check_package, "  ")
+]
 
 def main():
     print("Checking installed packages...\n")
     
-    # Core packages
-    core_packages = ["fastapi", "uvicorn", "pydantic", "requests", "dotenv"]
-    print("Core packages:")
-    for package in core_packages:
-        print(f"  {check_package(package)}")
-    
-    # Document processing packages
-    doc_packages = ["PyPDF2", "pdfplumber", "pdf2image", "pytesseract", 
-                   "docx", "odf", "pandas", "openpyxl", "bs4", "html2text", "PIL"]
-    print("\nDocument processing packages:")
-    for package in doc_packages:
-        print(f"  {check_package(package)}")
-    
-    # AI packages
-    ai_packages = ["google.generativeai", "openai", "anthropic", "mistralai"]
-    print("\nAI packages:")
-    for package in ai_packages:
-        try:
-            importlib.import_module(package)
-            print(f"[INSTALLED] {package}")
-        except ImportError:
-            print(f"[MISSING] {package} (Not installed)")
-    
-    # Utility packages
-    util_packages = ["aiofiles", "jose", "tenacity"]
-    print("\nUtility packages:")
-    for package in util_packages:
-        print(f"  {check_package(package)}")
+    # Check every package concurrently so file system lookups overlap, then print the results in order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        groups = [
+            (heading, indent, [executor.submit(checker, package) for package in packages])
+            for heading, packages, checker, indent in PACKAGE_GROUPS
+        ]
+        for heading, indent, futures in groups:
+            print(heading)
+            for future in futures:
+                print(f"{indent}{future.result()}")
     
     print("\nPython version:", sys.version)
     print("\nSetup verification complete!")
@@ -4,43 +4,138 @@ Handles document processing, text extraction, and preprocessing
 """
 
 import os
-import sys
+import re
+import uuid
+import stat
+import shutil
+import asyncio
+import hashlib
+import functools
+import mimetypes
 import logging
 import tempfile
 import requests
-from typing import Dict, Any, Optional, List, Union
+import aiofiles
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Union
 from urllib.parse import urlparse
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.text_extraction import extract_text_chunks
 
-from utils.text_extraction import extract_text_from_file
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Async HTTP client for fetching many documents concurrently over one connection pool
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+# Chunk size used when streaming downloads to disk and hashing files
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Downloads in flight at once in extract_many_async, so a large batch does not saturate the network
+MAX_CONCURRENT_DOWNLOADS = 8
+
+# Extracted text is cached on disk by file content, shared by every worker process and kept across restarts
+# Bump EXTRACTION_CACHE_VERSION when extraction or preprocessing changes so stale text is never served
+# The default directory is per user; it is only used if this user owns it and nobody else can access it
+EXTRACTION_CACHE_DIR = os.getenv(
+    "EXTRACTION_CACHE_DIR",
+    os.path.join(
+        tempfile.gettempdir(),
+        f"research-summarizer-text-cache-{os.getuid()}" if hasattr(os, "getuid") else "research-summarizer-text-cache"
+    )
+)
+EXTRACTION_CACHE_VERSION = "4"
+
+# Most extracted texts kept in the cache; the least recently used are deleted beyond this
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "512"))
+
+# File extension for each downloadable content type; others fall back to mimetypes, then .bin
+CONTENT_TYPE_EXTENSIONS = {
+    'application/pdf': '.pdf',
+    'application/x-pdf': '.pdf',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/tiff': '.tiff',
+    'image/bmp': '.bmp',
+    'application/msword': '.doc',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
+    'text/plain': '.txt',
+    'text/csv': '.csv',
+    'application/vnd.ms-excel': '.xls',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx'
+}
+
+# Blank lines (possibly holding stray spaces) separate paragraphs in extracted text
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+# Runs of spaces and tabs, collapsed by the 'minimal' preprocessing mode
+_HORIZONTAL_WS_RE = re.compile(r'[ \t]+')
+# Common OCR misreads, fixed in one str.translate pass
+# Zeros are left alone: rewriting them as the letter O corrupted every number in the document
+_OCR_FIXES = str.maketrans({'|': 'I'})
+
 class DocumentProcessor:
     """Document processing class for handling various file types"""
     
     def __init__(self):
         """Initialize the document processor"""
-        # Create a temporary directory for downloaded files
-        self.temp_dir = tempfile.mkdtemp()
-        logger.info(f"Initialized DocumentProcessor with temp directory: {self.temp_dir}")
+        # Create a temporary directory for downloaded files, removed on close() or when the processor is collected
+        self._temp_dir = tempfile.TemporaryDirectory(prefix="docproc_")
+        self.temp_dir = self._temp_dir.name
+        # The cache holds document plaintext, so other users of the system temp dir may not read it,
+        # and a directory someone else created could serve planted text for any upload
+        try:
+            os.makedirs(EXTRACTION_CACHE_DIR, mode=0o700, exist_ok=True)
+            self.cache_enabled = _is_private_dir(EXTRACTION_CACHE_DIR)
+        except OSError as e:
+            logger.warning("Could not create extraction cache directory %s: %s", EXTRACTION_CACHE_DIR, e)
+            self.cache_enabled = False
+        if not self.cache_enabled:
+            logger.warning("Extraction cache disabled: %s is not a private directory owned by this user", EXTRACTION_CACHE_DIR)
+        
+        # Pooled session so repeated downloads from the same host reuse TCP and TLS connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        logger.info("Initialized DocumentProcessor with temp directory: %s", self.temp_dir)
+    
+    def close(self) -> None:
+        """Close pooled connections and delete downloaded files"""
+        self.session.close()
+        self._temp_dir.cleanup()
     
-    def extract_text(self, file_path: str, file_type: str) -> str:
+    def __enter__(self) -> "DocumentProcessor":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def extract_text(self, file_path: str, file_type: str, preprocess: Union[bool, str] = True) -> str:
         """
         Extract text from a document
         
         Args:
             file_path: Path to the document (local path or URL)
             file_type: Type of document (pdf, image, etc.)
+            preprocess: True to clean up paragraphs and OCR errors, 'minimal' to only collapse
+                spaces and tabs, False to return the raw text for summarizers that normalize it themselves
             
         Returns:
             Extracted text from the document
         """
-        logger.info(f"Extracting text from {file_path} of type {file_type}")
+        logger.info("Extracting text from %s of type %s", file_path, file_type)
         
         # Handle URL-based files
         if file_path.startswith('http'):
@@ -49,22 +144,185 @@ class DocumentProcessor:
                 raise ValueError(f"Failed to download file from {file_path}")
             file_path = local_path
         
-        # Extract text based on file type
+        # Identical file content was already extracted, possibly by another worker
+        mode = 'minimal' if preprocess == 'minimal' else ('full' if preprocess else 'raw')
+        cache_path = None
+        if self.cache_enabled:
+            cache_path = self._cache_path(self._file_digest(file_path), file_type, mode)
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    logger.info("Using cached text for %s", file_path)
+                    cached_text = f.read()
+                # The modification time marks recent use for eviction
+                os.utime(cache_path)
+                return cached_text
+            except FileNotFoundError:
+                pass
+        
+        # Extract text based on file type, preprocessing each chunk (a page for PDFs) as it arrives
+        # so the raw text of the whole document is never held in memory
         try:
-            extracted_text = extract_text_from_file(file_path, file_type)
+            paragraphs = extract_text_chunks(file_path, file_type)
+            if mode == 'full':
+                paragraphs = (self._preprocess_text(chunk) for chunk in paragraphs)
+            elif mode == 'minimal':
+                paragraphs = (_HORIZONTAL_WS_RE.sub(' ', chunk).strip() for chunk in paragraphs)
+            processed_text = '\n\n'.join(paragraph for paragraph in paragraphs if paragraph)
             
-            # Apply text preprocessing
-            processed_text = self._preprocess_text(extracted_text)
-            
-            # Log extraction statistics
-            word_count = len(processed_text.split())
-            logger.info(f"Extracted {word_count} words from document")
+            # Log extraction statistics; fully preprocessed paragraphs hold single-spaced words, so counting separators is exact
+            if processed_text and logger.isEnabledFor(logging.DEBUG):
+                if mode == 'full':
+                    word_count = processed_text.count(' ') + processed_text.count('\n\n') + 1
+                else:
+                    word_count = len(processed_text.split())
+                logger.debug("Extracted %d words from document", word_count)
             
+            # Extractors raise on failure, so only real text reaches here; empty results are retried next time
+            if cache_path and processed_text:
+                self._store_cached_text(cache_path, processed_text)
             return processed_text
         except Exception as e:
-            logger.error(f"Error extracting text: {str(e)}", exc_info=True)
+            logger.error("Error extracting text: %s", e, exc_info=True)
             raise
     
+    def extract_many(self, jobs: List[Tuple[str, str]], max_workers: Optional[int] = None,
+                     preprocess: Union[bool, str] = True) -> List[str]:
+        """
+        Extract text from several documents in parallel worker processes
+        PDF parsing and OCR are CPU-bound, so processes rather than threads give a per-core speedup
+        Must not be called from inside a worker process, which cannot start its own pool
+        
+        Args:
+            jobs: (file_path, file_type) pairs, local paths or URLs
+            max_workers: Number of worker processes, defaults to the CPU count
+            preprocess: Preprocessing mode passed to extract_text
+            
+        Returns:
+            Extracted text for each job, in order
+        """
+        if len(jobs) <= 1:
+            return [self.extract_text(file_path, file_type, preprocess) for file_path, file_type in jobs]
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(functools.partial(_extract_document, preprocess=preprocess), jobs))
+    
+    async def extract_many_async(self, jobs: List[Tuple[str, str]], max_workers: Optional[int] = None,
+                                 preprocess: Union[bool, str] = True) -> List[str]:
+        """
+        Extract text from several documents, overlapping downloads with extraction
+        Each URL is downloaded on the event loop and handed to a worker process as soon as it arrives,
+        so later files download while earlier ones are being parsed
+        
+        Args:
+            jobs: (file_path, file_type) pairs, local paths or URLs
+            max_workers: Number of worker processes, defaults to the CPU count
+            preprocess: Preprocessing mode passed to extract_text
+            
+        Returns:
+            Extracted text for each job, in order
+        """
+        loop = asyncio.get_running_loop()
+        download_slots = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        
+        async def process(client: Optional["httpx.AsyncClient"], file_path: str, file_type: str) -> str:
+            if file_path.startswith('http'):
+                async with download_slots:
+                    if client is None:
+                        local_path = await asyncio.to_thread(self._download_file, file_path)
+                    else:
+                        local_path = await self._download_file_async(client, file_path)
+                if not local_path:
+                    raise ValueError(f"Failed to download file from {file_path}")
+                file_path = local_path
+            return await loop.run_in_executor(executor, _extract_document, (file_path, file_type), preprocess)
+        
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            if not HAS_HTTPX:
+                return await asyncio.gather(*(process(None, file_path, file_type) for file_path, file_type in jobs))
+            async with httpx.AsyncClient(follow_redirects=True, timeout=60) as client:
+                return await asyncio.gather(*(process(client, file_path, file_type) for file_path, file_type in jobs))
+    
+    def _file_digest(self, file_path: str) -> str:
+        """
+        Compute the SHA-256 digest of a file's content
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Hex digest of the file
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+    
+    def _cache_path(self, digest: str, file_type: str, mode: str = 'full') -> str:
+        """
+        Get the extraction cache file for a file digest, type and preprocessing mode
+        """
+        # file_type comes from the request, so only its alphanumeric characters reach the path
+        safe_type = ''.join(c for c in file_type if c.isalnum())
+        variant = '' if mode == 'full' else f".{mode}"
+        return os.path.join(EXTRACTION_CACHE_DIR, f"{digest}.{safe_type}{variant}.v{EXTRACTION_CACHE_VERSION}.txt")
+    
+    def _store_cached_text(self, cache_path: str, text: str) -> None:
+        """
+        Write extracted text to the cache atomically so concurrent readers never see a partial file
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=EXTRACTION_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning("Could not cache extracted text: %s", e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict_cached_text()
+    
+    def _evict_cached_text(self) -> None:
+        """
+        Delete the least recently used cache files beyond EXTRACTION_CACHE_MAX_ENTRIES
+        Other worker processes may evict at the same time, so files that are already gone are skipped
+        """
+        entries = []
+        with os.scandir(EXTRACTION_CACHE_DIR) as scan:
+            for entry in scan:
+                if not entry.name.endswith('.txt'):
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        
+        excess = len(entries) - EXTRACTION_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        for _, path in sorted(entries)[:excess]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def _download_filename(self, url: str, headers: Any) -> str:
+        """
+        Name a downloaded file after the URL path, or after the response content type when the path has no filename
+        
+        Args:
+            url: URL being downloaded
+            headers: Response headers of the download
+            
+        Returns:
+            File name for the download
+        """
+        filename = os.path.basename(urlparse(url).path)
+        if filename:
+            return filename
+        ext = self._get_extension_from_content_type(headers.get('Content-Type', ''))
+        return f"downloaded_file{ext}"
+    
     def _download_file(self, url: str) -> Optional[str]:
         """
         Download a file from a URL to a temporary location
@@ -76,37 +334,89 @@ class DocumentProcessor:
             Local path to the downloaded file, or None if download failed
         """
         try:
-            logger.info(f"Downloading file from {url}")
-            
-            # Parse URL to get filename
-            parsed_url = urlparse(url)
-            filename = os.path.basename(parsed_url.path)
+            logger.info("Downloading file from %s", url)
             
-            # If no filename, use a default name based on content type
-            if not filename:
-                response = requests.head(url)
-                content_type = response.headers.get('Content-Type', '')
-                ext = self._get_extension_from_content_type(content_type)
-                filename = f"downloaded_file{ext}"
+            # Download the file; headers arrive before the body, so no separate HEAD request is needed
+            with self.session.get(url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                
+                # Create temporary file path, named after the URL or else the content type
+                # and prefixed so downloads of same-named files do not overwrite each other
+                filename = self._download_filename(url, response.headers)
+                local_path = os.path.join(self.temp_dir, f"{uuid.uuid4().hex[:8]}_{filename}")
+                
+                # Copy in C with one large buffer; decode_content undoes any gzip transfer encoding
+                response.raw.decode_content = True
+                with open(local_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
             
-            # Create temporary file path
-            local_path = os.path.join(self.temp_dir, filename)
+            logger.info("Downloaded file to %s", local_path)
+            return local_path
+        
+        except Exception as e:
+            logger.error("Error downloading file: %s", e, exc_info=True)
+            return None
+    
+    async def _download_file_async(self, client: "httpx.AsyncClient", url: str) -> Optional[str]:
+        """
+        Download a file from a URL to a temporary location without blocking the event loop
+        
+        Args:
+            client: Shared async HTTP client, so concurrent downloads reuse its connections
+            url: URL of the file to download
             
-            # Download the file
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
+        Returns:
+            Local path to the downloaded file, or None if download failed
+        """
+        try:
+            logger.info("Downloading file from %s", url)
             
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                
+                # Prefix the name so concurrent downloads of same-named files do not collide
+                filename = self._download_filename(url, response.headers)
+                local_path = os.path.join(self.temp_dir, f"{uuid.uuid4().hex[:8]}_{filename}")
+                
+                async with aiofiles.open(local_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
             
-            logger.info(f"Downloaded file to {local_path}")
+            logger.info("Downloaded file to %s", local_path)
             return local_path
         
         except Exception as e:
-            logger.error(f"Error downloading file: {str(e)}", exc_info=True)
+            logger.error("Error downloading file: %s", e, exc_info=True)
             return None
     
+    async def download_many_async(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        Download several files concurrently
+        
+        Args:
+            urls: URLs of the files to download
+            
+        Returns:
+            Local path for each URL in order, or None where the download failed
+        """
+        if not HAS_HTTPX:
+            return await asyncio.gather(*(asyncio.to_thread(self._download_file, url) for url in urls))
+        async with httpx.AsyncClient(follow_redirects=True, timeout=60) as client:
+            return await asyncio.gather(*(self._download_file_async(client, url) for url in urls))
+    
+    def download_many(self, urls: List[str]) -> List[Optional[str]]:
+        """
+        Download several files concurrently from synchronous code
+        Use download_many_async when an event loop is already running
+        
+        Args:
+            urls: URLs of the files to download
+            
+        Returns:
+            Local path for each URL in order, or None where the download failed
+        """
+        return asyncio.run(self.download_many_async(urls))
+    
     def _get_extension_from_content_type(self, content_type: str) -> str:
         """
         Get file extension from content type
@@ -117,34 +427,9 @@ class DocumentProcessor:
         Returns:
             File extension including the dot
         """
-        content_type = content_type.lower()
-        
-        if 'pdf' in content_type:
-            return '.pdf'
-        elif 'image/jpeg' in content_type or 'image/jpg' in content_type:
-            return '.jpg'
-        elif 'image/png' in content_type:
-            return '.png'
-        elif 'image/webp' in content_type:
-            return '.webp'
-        elif 'image/tiff' in content_type:
-            return '.tiff'
-        elif 'image/bmp' in content_type:
-            return '.bmp'
-        elif 'application/msword' in content_type:
-            return '.doc'
-        elif 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' in content_type:
-            return '.docx'
-        elif 'text/plain' in content_type:
-            return '.txt'
-        elif 'text/csv' in content_type:
-            return '.csv'
-        elif 'application/vnd.ms-excel' in content_type:
-            return '.xls'
-        elif 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' in content_type:
-            return '.xlsx'
-        else:
-            return '.bin'
+        # Drop parameters such as "; charset=utf-8" before looking the type up
+        content_type = content_type.split(';', 1)[0].strip().lower()
+        return CONTENT_TYPE_EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type) or '.bin'
     
     def _preprocess_text(self, text: str) -> str:
         """
@@ -159,30 +444,39 @@ class DocumentProcessor:
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        text = ' '.join(text.split())
+        # Split into paragraphs at blank lines and collapse the whitespace inside each one
+        paragraphs = (' '.join(block.split()) for block in _PARAGRAPH_BREAK_RE.split(text))
+        processed_text = '\n\n'.join(paragraph for paragraph in paragraphs if paragraph)
         
         # Fix common OCR errors
-        text = text.replace('|', 'I')
-        text = text.replace('0', 'O')
-        
-        # Split into paragraphs for better readability
-        lines = text.splitlines()
-        paragraphs = []
-        current_paragraph = []
-        
-        for line in lines:
-            if not line.strip():
-                if current_paragraph:
-                    paragraphs.append(' '.join(current_paragraph))
-                    current_paragraph = []
-            else:
-                current_paragraph.append(line)
-        
-        if current_paragraph:
-            paragraphs.append(' '.join(current_paragraph))
-        
-        # Join paragraphs with double newlines
-        processed_text = '\n\n'.join(paragraphs)
+        return processed_text.translate(_OCR_FIXES)
+
+@functools.lru_cache(maxsize=1)
+def _worker_processor() -> DocumentProcessor:
+    """
+    Get the DocumentProcessor of the current extract_many worker process, creating it on first use
+    """
+    return DocumentProcessor()
+
+def _is_private_dir(path: str) -> bool:
+    """
+    Check that a path is a real directory owned by the current user with no group or other permissions
+    
+    Args:
+        path: Directory to check
         
-        return processed_text
+    Returns:
+        True if the directory is safe to keep private data in
+    """
+    # Windows has no POSIX owner or mode bits; its default temp dir is already per user
+    if not hasattr(os, "getuid"):
+        return os.path.isdir(path)
+    st = os.lstat(path)
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+def _extract_document(job: Tuple[str, str], preprocess: Union[bool, str] = True) -> str:
+    """
+    Extract one extract_many job; module-level so it can be sent to worker processes
+    """
+    file_path, file_type = job
+    return _worker_processor().extract_text(file_path, file_type, preprocess)
@@ -4,18 +4,21 @@ Handles document chunking, embedding, retrieval, and context-aware question answ
 """
 
 import os
+import re
 import sys
+import heapq
 import logging
 import numpy as np
 import uuid
-from typing import Dict, Any, Optional, List, Union
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Union
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Check if the API keys are loaded
@@ -166,6 +169,21 @@ except ImportError:
     supabase_client = None
     logger.warning("Supabase Python client not installed. Vector storage will be in-memory only.")
 
+# Chunks sent per embeddings request; 100 chunks of 500 words stay well under the per-request token limit
+EMBEDDING_BATCH_SIZE = 100
+
+# Embeddings requests in flight at once for documents that need several batches
+EMBEDDING_MAX_IN_FLIGHT = 8
+
+# Documents ingested at once by process_documents; each may itself send several embedding batches
+DOCUMENT_INGEST_WORKERS = 4
+
+# Question embeddings kept per RAGProcessor, so a repeated question skips the embeddings request
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Words matched by the keyword-search fallback
+_WORD_RE = re.compile(r'\w+')
+
 class RAGProcessor:
     """RAG processing class for context-aware question answering"""
     
@@ -173,9 +191,33 @@ class RAGProcessor:
         """Initialize the RAG processor"""
         # In-memory storage for document chunks and embeddings when Supabase is not available
         self.document_chunks = {}
-        self.document_embeddings = {}
+        # Lowercased word counts of each chunk stored without embeddings, for keyword search;
+        # kept apart from document_chunks because chunk dicts are returned to callers as source chunks
+        self.chunk_keywords = {}
+        # Per document: unit-normalized chunk embeddings as one float32 matrix, and the IDs of the document's
+        # in-memory chunks in order, which are also the matrix rows when embeddings exist
+        self.document_matrix = {}
+        self.document_chunk_order = {}
+        # Guards each matrix/chunk-order pair, so a concurrent query never sees one without the other
+        self._memory_lock = threading.Lock()
+        self._query_embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_embedding_lock = threading.Lock()
         logger.info("Initialized RAGProcessor")
     
+    def warm_up(self) -> None:
+        """
+        Embed a short string so the embedding client's connection is set up
+        before the first real request
+        """
+        if not (HAS_OPENAI and OPENAI_API_KEY):
+            return
+        
+        try:
+            self._generate_embedding_openai("warm up")
+            logger.info("RAG embedding warm-up complete")
+        except Exception as e:
+            logger.warning(f"RAG embedding warm-up failed: {str(e)}")
+    
     def process_document(self, document_id: str, document_text: str, chunk_size: int = 500, chunk_overlap: int = 100) -> Dict[str, Any]:
         """
         Process a document for RAG by chunking and embedding
@@ -199,9 +241,11 @@ class RAGProcessor:
             # Generate embeddings for each chunk
             chunk_ids = []
             if HAS_OPENAI and OPENAI_API_KEY:
-                for i, chunk in enumerate(chunks):
+                memory_rows = []
+                memory_chunk_ids = []
+                embeddings = self._generate_embeddings_openai(chunks)
+                for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
                     chunk_id = f"{document_id}_chunk_{i}"
-                    embedding = self._generate_embedding_openai(chunk)
                     
                     # Store in Supabase if available, otherwise store in memory
                     if HAS_SUPABASE and supabase_client:
@@ -212,10 +256,17 @@ class RAGProcessor:
                             "chunk_text": chunk,
                             "chunk_index": i
                         }
-                        self.document_embeddings[chunk_id] = embedding
+                        memory_rows.append(embedding)
+                        memory_chunk_ids.append(chunk_id)
                     
                     chunk_ids.append(chunk_id)
                 
+                if memory_rows:
+                    matrix = np.vstack(memory_rows)
+                    with self._memory_lock:
+                        self.document_matrix[document_id] = matrix
+                        self.document_chunk_order[document_id] = memory_chunk_ids
+                
                 logger.info(f"Generated embeddings for {len(chunks)} chunks")
                 
                 return {
@@ -234,8 +285,13 @@ class RAGProcessor:
                         "chunk_text": chunk,
                         "chunk_index": i
                     }
+                    self.chunk_keywords[chunk_id] = self._keyword_counts(chunk)
                     chunk_ids.append(chunk_id)
                 
+                with self._memory_lock:
+                    self.document_matrix.pop(document_id, None)
+                    self.document_chunk_order[document_id] = chunk_ids
+                
                 return {
                     "status": "success",
                     "document_id": document_id,
@@ -251,6 +307,29 @@ class RAGProcessor:
                 "error": str(e)
             }
     
+    def process_documents(self, documents: List[Tuple[str, str]], chunk_size: int = 500, chunk_overlap: int = 100,
+                          max_workers: int = DOCUMENT_INGEST_WORKERS) -> List[Dict[str, Any]]:
+        """
+        Process several documents for RAG concurrently
+        Ingestion is dominated by embedding requests, so threads overlap the network waits
+        
+        Args:
+            documents: (document_id, document_text) pairs
+            chunk_size: Size of each chunk in words (default: 500)
+            chunk_overlap: Overlap between chunks in words (default: 100)
+            max_workers: Number of documents processed at once
+            
+        Returns:
+            Processing result for each document, in order
+        """
+        if len(documents) <= 1:
+            return [self.process_document(document_id, document_text, chunk_size, chunk_overlap)
+                    for document_id, document_text in documents]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(documents))) as executor:
+            futures = [executor.submit(self.process_document, document_id, document_text, chunk_size, chunk_overlap)
+                       for document_id, document_text in documents]
+            return [future.result() for future in futures]
+    
     def answer_question(self, question: str, document_id: str, model: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
         """
         Answer a question using RAG
@@ -291,11 +370,11 @@ class RAGProcessor:
                 
                 # Try to find the document in memory
                 document_text = ""
-                for doc_id, chunks in self.document_chunks.items():
-                    if doc_id == document_id and chunks:
-                        # Use the first chunk as a sample of the document
-                        document_text = chunks[0]["chunk_text"]
-                        break
+                with self._memory_lock:
+                    chunk_order = self.document_chunk_order.get(document_id)
+                if chunk_order:
+                    # Use the first chunk as a sample of the document
+                    document_text = self.document_chunks[chunk_order[0]]["chunk_text"]
                 
                 if not document_text:
                     return {
@@ -490,20 +569,18 @@ class RAGProcessor:
             List of text chunks
         """
         words = text.split()
-        chunks = []
         
         if len(words) <= chunk_size:
-            chunks.append(text)
-        else:
-            i = 0
-            while i < len(words):
-                chunk = " ".join(words[i:i + chunk_size])
-                chunks.append(chunk)
-                i += chunk_size - chunk_overlap
+            return [text]
+        
+        # A non-positive step would never advance through the document
+        step = chunk_size - chunk_overlap
+        if step <= 0:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
         
-        return chunks
+        return [" ".join(words[i:i + chunk_size]) for i in range(0, len(words), step)]
     
-    def _generate_embedding_openai(self, text: str) -> List[float]:
+    def _generate_embedding_openai(self, text: str) -> np.ndarray:
         """
         Generate embedding for text using OpenAI
         
@@ -511,7 +588,7 @@ class RAGProcessor:
             text: Text to embed
             
         Returns:
-            Embedding vector
+            Unit-length float32 embedding vector, so similarity to another embedding is a plain dot product
         """
         if not HAS_OPENAI or not OPENAI_API_KEY:
             raise ValueError("OpenAI API key not available for embeddings")
@@ -521,9 +598,77 @@ class RAGProcessor:
             input=text
         )
         
-        return response.data[0].embedding
+        return self._normalize_embedding(response.data[0].embedding)
+    
+    def _generate_query_embedding(self, query: str) -> np.ndarray:
+        """
+        Generate the embedding of a question, reusing it when the same question was asked before
+        
+        Args:
+            query: User's question
+            
+        Returns:
+            Unit-length float32 embedding vector, shared between callers and therefore read-only
+        """
+        # Questions that differ only in whitespace share one embedding
+        key = ' '.join(query.split())
+        with self._query_embedding_lock:
+            embedding = self._query_embedding_cache.get(key)
+            if embedding is not None:
+                self._query_embedding_cache.move_to_end(key)
+                return embedding
+        
+        embedding = self._generate_embedding_openai(key)
+        embedding.setflags(write=False)
+        with self._query_embedding_lock:
+            self._query_embedding_cache[key] = embedding
+            self._query_embedding_cache.move_to_end(key)
+            if len(self._query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embedding_cache.popitem(last=False)
+        return embedding
+    
+    def _generate_embeddings_openai(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> List[np.ndarray]:
+        """
+        Generate embeddings for several texts using OpenAI, sending the batches concurrently
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Maximum number of texts per embeddings request
+            
+        Returns:
+            Unit-length float32 embedding vector for each text, in order
+        """
+        if not HAS_OPENAI or not OPENAI_API_KEY:
+            raise ValueError("OpenAI API key not available for embeddings")
+        
+        batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+        if len(batches) <= 1:
+            results = [self._embed_batch_openai(batch) for batch in batches]
+        else:
+            # The OpenAI client is thread-safe, and threads also work when called from inside an event loop
+            with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_IN_FLIGHT, len(batches))) as executor:
+                results = list(executor.map(self._embed_batch_openai, batches))
+        
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+    
+    def _embed_batch_openai(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed one batch of texts in a single OpenAI request
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Unit-length float32 embedding vector for each text, in order
+        """
+        response = openai_client.embeddings.create(
+            model="text-embedding-ada-002",
+            input=texts
+        )
+        # Each result carries the position of its input, so order does not depend on the response
+        return [self._normalize_embedding(item.embedding) for item in sorted(response.data, key=lambda item: item.index)]
     
-    def _store_chunk_in_supabase(self, chunk_id: str, document_id: str, chunk_text: str, embedding: List[float]) -> None:
+    def _store_chunk_in_supabase(self, chunk_id: str, document_id: str, chunk_text: str, embedding: np.ndarray) -> None:
         """
         Store chunk and embedding in Supabase
         
@@ -541,7 +686,7 @@ class RAGProcessor:
                 "id": chunk_id,
                 "document_id": document_id,
                 "chunk_text": chunk_text,
-                "embedding": embedding
+                "embedding": embedding.tolist()
             }).execute()
             
             logger.info(f"Stored chunk {chunk_id} in Supabase")
@@ -563,7 +708,7 @@ class RAGProcessor:
         """
         # If OpenAI is available, use vector search
         if HAS_OPENAI and OPENAI_API_KEY:
-            query_embedding = self._generate_embedding_openai(query)
+            query_embedding = self._generate_query_embedding(query)
             
             # If Supabase is available, use vector search in database
             if HAS_SUPABASE and supabase_client:
@@ -572,7 +717,7 @@ class RAGProcessor:
                     response = supabase_client.rpc(
                         "match_document_chunks",
                         {
-                            "query_embedding": query_embedding,
+                            "query_embedding": query_embedding.tolist(),
                             "match_document_id": document_id,
                             "match_count": top_k
                         }
@@ -589,25 +734,23 @@ class RAGProcessor:
                     logger.info("Falling back to in-memory vector search")
             
             # In-memory vector search
-            document_chunks = [chunk for chunk_id, chunk in self.document_chunks.items() 
-                              if chunk["document_id"] == document_id]
-            
-            if not document_chunks:
+            with self._memory_lock:
+                matrix = self.document_matrix.get(document_id)
+                chunk_order = self.document_chunk_order.get(document_id)
+            if matrix is None:
                 logger.warning(f"No chunks found in memory for document {document_id}")
                 return []
             
-            # Calculate cosine similarity
-            similarities = []
-            for chunk_id, chunk in self.document_chunks.items():
-                if chunk["document_id"] == document_id:
-                    if chunk_id in self.document_embeddings:
-                        chunk_embedding = self.document_embeddings[chunk_id]
-                        similarity = self._cosine_similarity(query_embedding, chunk_embedding)
-                        similarities.append((chunk_id, similarity))
+            # Rows and query are unit vectors, so one matrix-vector product gives every chunk's cosine similarity
+            similarities = matrix @ query_embedding
             
-            # Sort by similarity and get top_k
-            similarities.sort(key=lambda x: x[1], reverse=True)
-            top_chunk_ids = [chunk_id for chunk_id, _ in similarities[:top_k]]
+            # Select the top_k without sorting every chunk, then order just those
+            k = min(top_k, len(similarities))
+            if k <= 0:
+                return []
+            top_rows = np.argpartition(-similarities, k - 1)[:k]
+            top_rows = top_rows[np.argsort(-similarities[top_rows], kind="stable")]
+            top_chunk_ids = [chunk_order[row] for row in top_rows]
             
             # Get chunk data
             result = []
@@ -621,26 +764,22 @@ class RAGProcessor:
         # Fallback to keyword search if embeddings are not available
         else:
             logger.warning("Falling back to basic keyword search (no embeddings available)")
-            document_chunks = [chunk for chunk_id, chunk in self.document_chunks.items() 
-                              if chunk["document_id"] == document_id]
+            with self._memory_lock:
+                chunk_order = self.document_chunk_order.get(document_id)
             
-            if not document_chunks:
+            if not chunk_order:
                 logger.warning(f"No chunks found for document {document_id}")
                 return []
             
-            # Simple keyword matching
-            query_words = set(query.lower().split())
+            # Score each chunk by how often the query words occur in it (term frequency)
+            query_words = self._keyword_counts(query).keys()
             chunk_scores = []
+            for chunk_id in chunk_order:
+                word_counts = self.chunk_keywords[chunk_id]
+                chunk_scores.append((chunk_id, sum(word_counts[word] for word in query_words)))
             
-            for chunk_id, chunk in self.document_chunks.items():
-                if chunk["document_id"] == document_id:
-                    chunk_text = chunk["chunk_text"].lower()
-                    score = sum(1 for word in query_words if word in chunk_text)
-                    chunk_scores.append((chunk_id, score))
-            
-            # Sort by score and get top_k
-            chunk_scores.sort(key=lambda x: x[1], reverse=True)
-            top_chunk_ids = [chunk_id for chunk_id, _ in chunk_scores[:top_k]]
+            # Get the top_k by score without sorting every chunk; ties keep document order as a stable sort would
+            top_chunk_ids = [chunk_id for chunk_id, _ in heapq.nlargest(top_k, chunk_scores, key=lambda x: x[1])]
             
             # Get chunk data
             result = []
@@ -651,28 +790,31 @@ class RAGProcessor:
             
             return result
     
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
+    def _keyword_counts(self, text: str) -> Counter:
         """
-        Calculate cosine similarity between two vectors
+        Count the lowercased words of a text for keyword search
         
         Args:
-            vec1: First vector
-            vec2: Second vector
+            text: Text to split into words
             
         Returns:
-            Cosine similarity score
+            Counter of words, without punctuation
         """
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        
-        dot_product = np.dot(vec1, vec2)
-        norm_vec1 = np.linalg.norm(vec1)
-        norm_vec2 = np.linalg.norm(vec2)
-        
-        if norm_vec1 == 0 or norm_vec2 == 0:
-            return 0
+        return Counter(_WORD_RE.findall(text.lower()))
+    
+    def _normalize_embedding(self, embedding: List[float]) -> np.ndarray:
+        """
+        Convert an embedding to a float32 unit vector
         
-        return dot_product / (norm_vec1 * norm_vec2)
+        Args:
+            embedding: Embedding vector
+            
+        Returns:
+            Unit-length vector, or the zero vector unchanged so its similarity to everything is 0
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
     
     def _generate_answer_gemini(self, question: str, context: str, conversation_history: List[Dict[str, str]]) -> str:
         """
@@ -8,11 +8,9 @@ import sys
 import json
 import logging
 import tempfile
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterator, Callable
 from urllib.parse import urlparse
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Define supported file types
@@ -30,7 +28,7 @@ try:
     # PDF processing
     import PyPDF2
     import pdfplumber
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, pdfinfo_from_path
     import pytesseract
     HAS_PDF_LIBS = True
 except ImportError:
@@ -76,66 +74,106 @@ except ImportError:
     logger.warning("Web content processing libraries not installed. Run: pip install requests beautifulsoup4 html2text")
     HAS_WEB_LIBS = False
 
-def extract_text_from_pdf(file_path: str) -> str:
+# A PDF method that finds less text than this is assumed to have failed, and the next method is tried
+PDF_MIN_TEXT_CHARS = 100
+
+def _pypdf2_pages(file_path: str) -> Iterator[str]:
     """
-    Extract text from PDF using multiple methods for best results
+    Yield the text of each PDF page using PyPDF2
+    """
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+def _pdfplumber_pages(file_path: str) -> Iterator[str]:
+    """
+    Yield the text of each PDF page using pdfplumber
+    """
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text() or ""
+            # pdfplumber keeps every parsed page's layout objects cached until closed
+            page.close()
+            yield text
+
+def _ocr_pages(file_path: str) -> Iterator[str]:
+    """
+    Yield the OCR text of each PDF page, rendering one page at a time to bound memory
+    """
+    page_count = pdfinfo_from_path(file_path)["Pages"]
+    for page_number in range(1, page_count + 1):
+        image = convert_from_path(file_path, first_page=page_number, last_page=page_number)[0]
+        # Enhance image for better OCR
+        image = image.convert('L')  # Convert to grayscale
+        image = ImageEnhance.Contrast(image).enhance(2.0)  # Increase contrast
+        image = image.filter(ImageFilter.SHARPEN)  # Sharpen image
+        
+        # Extract text with OCR
+        yield pytesseract.image_to_string(image) or ""
+
+# PDF extraction methods, from cheapest to most thorough
+PDF_METHODS: List[Tuple[str, Callable[[str], Iterator[str]]]] = [
+    ("PyPDF2", _pypdf2_pages),
+    ("pdfplumber", _pdfplumber_pages),
+    ("OCR", _ocr_pages)
+]
+
+def iter_text_from_pdf(file_path: str) -> Iterator[str]:
+    """
+    Extract text from PDF page by page, using multiple methods for best results
+    Pages are held back only until a method has found enough text to be trusted,
+    then streamed, so the whole document is never held in memory at once
     
     Args:
         file_path: Path to the PDF file
         
-    Returns:
-        Extracted text from the PDF
+    Yields:
+        Text of each page
     """
     if not HAS_PDF_LIBS:
         raise ImportError("PDF processing libraries not installed")
     
-    text = ""
-    
-    # Method 1: PyPDF2 for basic text extraction
-    try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                page_text = reader.pages[page_num].extract_text() or ""
-                text += page_text + "\n\n"
-        
-        logger.info(f"Extracted {len(text.split())} words using PyPDF2")
-    except Exception as e:
-        logger.warning(f"PyPDF2 extraction failed: {e}")
-    
-    # Method 2: If PyPDF2 didn't extract much text, try pdfplumber
-    if len(text.strip()) < 100:
-        try:
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text() or ""
-                    text += page_text + "\n\n"
-            
-            logger.info(f"Extracted {len(text.split())} words using pdfplumber")
-        except Exception as e:
-            logger.warning(f"pdfplumber extraction failed: {e}")
-    
-    # Method 3: If text is still minimal, try OCR as a last resort
-    if len(text.strip()) < 100:
+    for attempt, (method, pages) in enumerate(PDF_METHODS):
+        is_last = attempt == len(PDF_METHODS) - 1
+        held = []
+        streaming = False
+        word_count = 0
         try:
-            text = ""
-            images = convert_from_path(file_path)
-            for i, image in enumerate(images):
-                # Enhance image for better OCR
-                image = image.convert('L')  # Convert to grayscale
-                image = ImageEnhance.Contrast(image).enhance(2.0)  # Increase contrast
-                image = image.filter(ImageFilter.SHARPEN)  # Sharpen image
-                
-                # Extract text with OCR
-                page_text = pytesseract.image_to_string(image) or ""
-                text += page_text + "\n\n"
-            
-            logger.info(f"Extracted {len(text.split())} words using OCR")
+            for page_text in pages(file_path):
+                word_count += len(page_text.split())
+                if streaming:
+                    yield page_text
+                    continue
+                held.append(page_text)
+                if len("\n\n".join(held).strip()) >= PDF_MIN_TEXT_CHARS:
+                    streaming = True
+                    yield from held
+            logger.info(f"Extracted {word_count} words using {method}")
         except Exception as e:
-            logger.warning(f"OCR extraction failed: {e}")
+            # Pages already streamed cannot be taken back, so a failure part-way through is not retried
+            if streaming:
+                raise
+            logger.warning(f"{method} extraction failed: {e}")
+        
+        # Enough text was streamed, or this was the last method to try
+        if streaming:
+            return
+        if is_last:
+            yield from held
+            return
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """
+    Extract text from PDF using multiple methods for best results
     
-    return text
+    Args:
+        file_path: Path to the PDF file
+        
+    Returns:
+        Extracted text from the PDF
+    """
+    return "".join(page_text + "\n\n" for page_text in iter_text_from_pdf(file_path))
 
 def extract_text_from_doc(file_path: str) -> str:
     """
@@ -176,8 +214,7 @@ def extract_text_from_doc(file_path: str) -> str:
             word.Quit()
     
     except Exception as e:
-        logger.error(f"DOC extraction failed: {e}")
-        return ""
+        raise ValueError(f"DOC extraction failed: {e}") from e
 
 def extract_text_from_docx(file_path: str) -> str:
     """
@@ -211,8 +248,7 @@ def extract_text_from_docx(file_path: str) -> str:
         return text
     
     except Exception as e:
-        logger.error(f"DOCX extraction failed: {e}")
-        return ""
+        raise ValueError(f"DOCX extraction failed: {e}") from e
 
 def extract_text_from_odt(file_path: str) -> str:
     """
@@ -235,8 +271,51 @@ def extract_text_from_odt(file_path: str) -> str:
         logger.info(f"Extracted {len(text_content.split())} words from ODT")
         return text_content
     except Exception as e:
-        logger.error(f"ODT extraction failed: {e}")
-        return ""
+        raise ValueError(f"ODT extraction failed: {e}") from e
+
+def _ocr_image(image: "Image.Image") -> str:
+    """
+    Run the OCR pipeline on an already-loaded PIL image
+    
+    Args:
+        image: PIL image to extract text from
+        
+    Returns:
+        Extracted text from the image
+    """
+    # Preprocess image for better OCR results
+    # 1. Convert to grayscale
+    image = image.convert('L')
+    
+    # 2. Increase contrast
+    enhancer = ImageEnhance.Contrast(image)
+    image = enhancer.enhance(2.0)
+    
+    # 3. Apply sharpening filter
+    image = image.filter(ImageFilter.SHARPEN)
+    
+    # 4. Resize if too small
+    if image.width < 1000 or image.height < 1000:
+        scale_factor = max(1000 / image.width, 1000 / image.height)
+        new_width = int(image.width * scale_factor)
+        new_height = int(image.height * scale_factor)
+        image = image.resize((new_width, new_height), Image.LANCZOS)
+    
+    # Extract text using OCR
+    text = pytesseract.image_to_string(image)
+    
+    # Log extraction statistics
+    word_count = len(text.split())
+    logger.info(f"Extracted {word_count} words from image using OCR")
+    
+    # If text is very short, try different OCR configurations
+    if word_count < 10:
+        logger.info("Trying alternative OCR configuration")
+        custom_config = r'--oem 1 --psm 3'
+        text = pytesseract.image_to_string(image, config=custom_config)
+        logger.info(f"Extracted {len(text.split())} words with alternative OCR")
+    
+    return text
 
 def extract_text_from_image(file_path: str) -> str:
     """
@@ -258,45 +337,51 @@ def extract_text_from_image(file_path: str) -> str:
         # Open the image
         image = Image.open(file_path)
         
-        # Preprocess image for better OCR results
-        # 1. Convert to grayscale
-        image = image.convert('L')
-        
-        # 2. Increase contrast
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(2.0)
-        
-        # 3. Apply sharpening filter
-        image = image.filter(ImageFilter.SHARPEN)
-        
-        # 4. Resize if too small
-        if image.width < 1000 or image.height < 1000:
-            scale_factor = max(1000 / image.width, 1000 / image.height)
-            new_width = int(image.width * scale_factor)
-            new_height = int(image.height * scale_factor)
-            image = image.resize((new_width, new_height), Image.LANCZOS)
-        
-        # Extract text using OCR
-        text = pytesseract.image_to_string(image)
+        return _ocr_image(image)
+    
+    except Exception as e:
+        raise ValueError(f"Image extraction failed: {e}") from e
+
+def extract_text_from_image_array(image_array: Any) -> str:
+    """
+    Extract text from an in-memory image using OCR
+    In-memory counterpart of extract_text_from_image, avoids a temp file round-trip
+    
+    Args:
+        image_array: Decoded image as a numpy array (grayscale, or BGR as returned by cv2.imdecode)
         
-        # Log extraction statistics
-        word_count = len(text.split())
-        logger.info(f"Extracted {word_count} words from image using OCR")
+    Returns:
+        Extracted text from the image
+    """
+    if not HAS_IMAGE_LIBS:
+        raise ImportError("Image processing libraries not installed")
+    
+    try:
+        logger.info(f"Processing in-memory image of shape {image_array.shape}")
         
-        # If text is very short, try different OCR configurations
-        if word_count < 10:
-            logger.info("Trying alternative OCR configuration")
-            custom_config = r'--oem 1 --psm 3'
-            text = pytesseract.image_to_string(image, config=custom_config)
-            logger.info(f"Extracted {len(text.split())} words with alternative OCR")
+        # OpenCV decodes colour images as BGR, PIL expects RGB
+        if image_array.ndim == 3:
+            image_array = image_array[..., 2::-1]
+        image = Image.fromarray(image_array)
         
-        return text
+        return _ocr_image(image)
     
     except Exception as e:
-        logger.error(f"Image extraction failed: {e}")
-        
-        # Provide a more helpful error message but don't fail completely
-        return f"Image text extraction attempted but encountered issues: {str(e)}. The image may contain little text or be of low quality."
+        raise ValueError(f"Image extraction failed: {e}") from e
+
+def warm_up_ocr() -> None:
+    """
+    Run OCR once on a tiny blank image so the first real request doesn't pay
+    for loading Tesseract and its language data
+    """
+    if not HAS_IMAGE_LIBS:
+        return
+    
+    try:
+        pytesseract.image_to_string(Image.new('L', (32, 32), color=255))
+        logger.info("OCR warm-up complete")
+    except Exception as e:
+        logger.warning(f"OCR warm-up failed: {e}")
 
 def extract_text_from_excel(file_path: str) -> str:
     """
@@ -327,8 +412,7 @@ def extract_text_from_excel(file_path: str) -> str:
         logger.info(f"Extracted {len(text.split())} words from Excel")
         return text
     except Exception as e:
-        logger.error(f"Excel extraction failed: {e}")
-        return ""
+        raise ValueError(f"Excel extraction failed: {e}") from e
 
 def extract_text_from_csv(file_path: str) -> str:
     """
@@ -353,8 +437,27 @@ def extract_text_from_csv(file_path: str) -> str:
         logger.info(f"Extracted {len(text.split())} words from CSV")
         return text
     except Exception as e:
-        logger.error(f"CSV extraction failed: {e}")
-        return ""
+        raise ValueError(f"CSV extraction failed: {e}") from e
+
+def extract_text_from_txt(file_path: str) -> str:
+    """
+    Extract text from plain text files
+    The file is read as bytes and decoded once, so invalid UTF-8 is replaced instead of failing
+    
+    Args:
+        file_path: Path to the text file
+        
+    Returns:
+        Decoded text from the file
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            text = f.read().decode('utf-8', errors='replace')
+        
+        logger.info(f"Extracted {len(text)} characters from text file")
+        return text
+    except Exception as e:
+        raise ValueError(f"Text file extraction failed: {e}") from e
 
 def extract_text_from_html(file_path: str) -> str:
     """
@@ -396,8 +499,7 @@ def extract_text_from_html(file_path: str) -> str:
         logger.info(f"Extracted {len(text.split())} words from HTML")
         return text
     except Exception as e:
-        logger.error(f"HTML extraction failed: {e}")
-        return ""
+        raise ValueError(f"HTML extraction failed: {e}") from e
 
 def extract_text_from_url(url: str) -> str:
     """
@@ -435,8 +537,7 @@ def extract_text_from_url(url: str) -> str:
         logger.info(f"Extracted {len(text.split())} words from URL")
         return text
     except Exception as e:
-        logger.error(f"URL extraction failed: {e}")
-        return ""
+        raise ValueError(f"URL extraction failed: {e}") from e
 
 def preprocess_text(text: str) -> str:
     """
@@ -451,24 +552,20 @@ def preprocess_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove excessive newlines
-    text = '\n'.join([line for line in text.splitlines() if line.strip()])
-    
-    # Remove excessive spaces
-    text = ' '.join([word for word in text.split() if word])
-    
-    return text
+    # Collapse all whitespace, blank lines included, to single spaces in one C-level split/join
+    return ' '.join(text.split())
 
-def extract_text_from_file(file_path: str, file_type: str = None) -> str:
+def extract_text_chunks(file_path: str, file_type: str = None) -> Iterator[str]:
     """
-    Main function to extract text from any file type
+    Extract raw text from any file type as a stream of chunks
+    PDFs are streamed page by page; other formats produce a single chunk
     
     Args:
         file_path: Path to the file
         file_type: Type of file (pdf, image, etc.)
         
-    Returns:
-        Extracted text from the file
+    Yields:
+        Raw text chunks, to be treated as separate paragraphs
     """
     # Determine file type if not provided
     if not file_type:
@@ -481,40 +578,46 @@ def extract_text_from_file(file_path: str, file_type: str = None) -> str:
     # Extract text based on file type
     try:
         if file_type in SUPPORTED_FILE_TYPES['pdf'] or file_type == 'pdf':
-            text = extract_text_from_pdf(file_path)
+            yield from iter_text_from_pdf(file_path)
         elif any(file_type in ext_list for ext_list in [SUPPORTED_FILE_TYPES['image']]) or file_type == 'image':
-            text = extract_text_from_image(file_path)
+            yield extract_text_from_image(file_path)
         elif file_type == 'docx':
-            text = extract_text_from_docx(file_path)
+            yield extract_text_from_docx(file_path)
         elif file_type == 'doc':
-            text = extract_text_from_doc(file_path)
+            yield extract_text_from_doc(file_path)
         elif file_type == 'odt':
-            text = extract_text_from_odt(file_path)
+            yield extract_text_from_odt(file_path)
         elif file_type in ['xlsx', 'xls']:
-            text = extract_text_from_excel(file_path)
+            yield extract_text_from_excel(file_path)
         elif file_type in ['csv']:
-            text = extract_text_from_csv(file_path)
+            yield extract_text_from_csv(file_path)
+        elif file_type == 'txt':
+            yield extract_text_from_txt(file_path)
         elif file_type in ['html', 'htm']:
-            text = extract_text_from_html(file_path)
+            yield extract_text_from_html(file_path)
         elif file_type.startswith('http'):
-            text = extract_text_from_url(file_path)
+            yield extract_text_from_url(file_path)
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
-        
-        # Preprocess the extracted text
-        text = preprocess_text(text)
-        
-        return text
     
     except Exception as e:
         logger.error(f"Error extracting text from {file_type} file: {e}", exc_info=True)
-        
-        # For image files, provide a graceful fallback rather than failing
-        if file_type == 'image' or file_type in SUPPORTED_FILE_TYPES['image']:
-            return f"Image text extraction attempted but encountered technical issues: {str(e)}. The system will try to process this image with alternative methods."
-        
         raise ValueError(f"Failed to extract text from {file_type} file: {str(e)}")
 
+def extract_text_from_file(file_path: str, file_type: str = None) -> str:
+    """
+    Main function to extract text from any file type
+    
+    Args:
+        file_path: Path to the file
+        file_type: Type of file (pdf, image, etc.)
+        
+    Returns:
+        Extracted text from the file
+    """
+    # Preprocess the extracted text; it collapses all whitespace, so chunks are simply joined
+    return preprocess_text("\n\n".join(extract_text_chunks(file_path, file_type)))
+
 if __name__ == "__main__":
     import argparse
     